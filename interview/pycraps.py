@@ -70,10 +70,25 @@ game starts...
 Plays a simplified game of craps based on the rules above. Dice, Rolls and players have their own classes. All players, including the house, can bet. The house never shoots (rolls dice).
 Bets are mechanical. Each player bets $100 on each round. The game ends when the house or all players are busted.
 
-The implementation uses python logging to trace the game similar to the transcript above (but not exactly).
+The implementation uses python logging to trace the game similar to the transcript above (but not exactly). `game()` itself doesn't log, it emits typed events
+to its `sinks`. `TextSink` turns them into the trace below, `SampledSink` traces every k-th round only. A game without sinks doesn't build any events.
+A `Profiler` passed to `game()` times the phases of each round (rolling, deciding, settling, ...) and exports them as a dict or collapsed stacks.
+`game_rounds()` plays a game one `RoundRecord` at a time for consumers that watch, throttle or stop it, `game()` just plays it to the end.
+Importing the module has no side effects: only the command line configures logging and loads `fire`, so worker processes start quickly.
 
 All dollar amounts are represented as `int` representing USD.
 
+Dice draw from numpy random Generators (PCG64). Pass `rng=<seed>` to `Roll`, `FixedRoll` or `game()` to replay a game roll for roll, and `spawn()` independent
+streams for games played in parallel.
+
+`game()` returns `Statistics`, counts plus running accumulators that take the same memory however long the game, and merge across games.
+
+The bets are data: a `RuleSet` of `Bet`s (pass, don't pass, odds, field) compiled into one lookup per roll. Betting `DONT_PASS` is the "negative bet" of the bonus.
+
+Shooters can be a list of `Shooter`s or a `BettorTable`, which keeps everyone's balance and bet in numpy arrays and settles a round with a few vector operations.
+
+A long game can snapshot itself with a `Checkpoint` and `resume()` after being killed, continuing roll for roll as if nothing happened.
+
 itertools.cycle is a cute way to cycle the available shooters in order until the game is over. Once a shooter is busted, he remains in the cycle but is just skipped.
 
 This implementation experiments with python3 properties which are used to annotate getter/setter functions. This provides some data encapsulation/protection not normally
@@ -600,21 +615,59 @@ Process finished with exit code 0
 
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-logger.debug(f"logging starts at level {logging.getLevelName(logger.getEffectiveLevel())}")
+logger = logging.getLogger(__name__)  ## configured by the command line only, @see craps(); a library leaves logging alone
 
 # import sys
 from enum import Enum, IntEnum, auto
-import random
+import copy
 from dataclasses import dataclass, field  # new in python3.7, more https://realpython.com/python-data-classes/
-from typing import List
-from itertools import cycle  ## https://docs.python.org/3/library/itertools.html#itertools.cycle
-import inspect
-import fire  ## https://github.com/google/python-fire/blob/master/docs/guide.md
+from typing import List, NamedTuple
+from itertools import cycle, islice  ## https://docs.python.org/3/library/itertools.html#itertools.cycle
+import os
+import pickle
+import time
+import numpy as np
 # import attrdict
 
 
+_rng = None  ## the generator of dice that aren't given one, created by the first such dice, @see shared_rng()
+
+
+def shared_rng() -> np.random.Generator:
+    """The unpredictable generator shared by all the dice without one of their own. Created on first use, not on import."""
+    global _rng
+    if _rng is None: _rng = np.random.default_rng()
+    return _rng
+
+
+# Random streams. Dice, Roll, FixedRoll and game() take an explicit numpy Generator (PCG64), or anything
+#   np.random.default_rng() turns into one: None for a fresh unpredictable stream, an int seed or a SeedSequence.
+#   Seeded streams replay a game roll for roll. Parallel games need independent streams, see spawn() and jumped().
+#   Needs numpy 1.17 or later, the first with Generator and SeedSequence.
+
+def spawn(seed, n: int, start: int = 0) -> List[np.random.Generator]:
+    """
+    `n` independent child streams of `seed`, e.g. one per worker. The children only depend on `seed` and their position:
+    child `i` is seeded with `seed`'s spawn key extended by `i`, so spawning again from the same `seed` gives the same
+    children. (SeedSequence.spawn() would count on from the children it spawned before.)
+    :param seed: int|SeedSequence|Generator, a Generator spawns from the SeedSequence it was seeded with.
+    :param start: int, the position of the first child, e.g. the index of a chunk's first game.
+    """
+    if isinstance(seed, np.random.Generator):
+        bit_generator = seed.bit_generator
+        seed = getattr(bit_generator, 'seed_seq', None) or bit_generator._seed_seq  ## public from numpy 1.25 on
+    if not isinstance(seed, np.random.SeedSequence): seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(np.random.SeedSequence(seed.entropy, spawn_key=tuple(seed.spawn_key) + (i,),
+                                                         pool_size=seed.pool_size)) for i in range(start, start + n)]
+
+
+def jumped(rng: np.random.Generator, n: int) -> List[np.random.Generator]:
+    """
+    `n` streams that continue `rng`'s stream as if 1, 2, ... n * 2**127 draws ahead, too far apart to ever overlap.
+    `rng` itself isn't advanced.
+    """
+    return [np.random.Generator(rng.bit_generator.jumped(i + 1)) for i in range(n)]
+
 
 class Dice:
     """
@@ -627,12 +680,72 @@ class Dice:
     after all to be equally probable devices.
     """
 
-    def __init__(self, values=list(range(1, 7))):
+    BLOCK = 256  ## faces drawn per call to the generator by roll()
+
+    def __init__(self, values=None, rng=None):
+        if values is None: values = list(range(1, 7))  ## `None` signals "six sides", a fresh list per dice
         if len(values) == 0: raise Exception('No faces provided.')
         self.values = values
+        self._faces = np.asarray(values)  ## the faces as an array, so many rolls can be drawn at once
+        self.rng = shared_rng() if rng is None else np.random.default_rng(rng)  ## @see spawn() for the kinds of rng
+        self._block, self._cursor = [], 0  ## faces drawn ahead for roll()
 
     def roll(self):
-        return random.choice(self.values)  # choose a dice face at random, all outcomes equally probable
+        """
+        Choose a dice face at random, all outcomes equally probable. A call to the generator costs about as much as
+        drawing a whole block, so the faces are drawn BLOCK at a time and served from the block.
+        """
+        if self._cursor == len(self._block):
+            self._block, self._cursor = self.roll_batch(self.BLOCK).tolist(), 0
+        self._cursor += 1
+        return self._block[self._cursor - 1]
+
+    def roll_batch(self, n: int, rng: np.random.Generator = None) -> np.ndarray:
+        """Roll this die `n` times in one call, returns an array of `n` faces. `rng` overrides the dice's own generator."""
+        return self._faces[(rng or self.rng).integers(0, len(self._faces), size=n)]
+
+
+class AliasTable:
+    """
+    Walker's alias table: draws `values` with probabilities `p` in O(1) per draw however many values there are. Every
+    slot holds a value, the probability of keeping it and the value it hands over to otherwise. @see Roll.distribution()
+    """
+
+    def __init__(self, values, p):
+        p = np.asarray(p, dtype=float)
+        if len(values) != len(p) or not len(p) or (p < 0).any() or not p.sum() > 0:
+            raise ValueError(f'need a non-negative probability for each of the {len(values)} values, got {p}')
+        self.values = np.asarray(values)
+        n = len(p)
+        scaled = p * (n / p.sum())  ## the average slot holds 1
+        self.keep = np.ones(n)
+        self.alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:  ## Vose's pairing: a short slot is topped up by a long one
+            s, l = small.pop(), large.pop()
+            self.keep[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        ## whatever is left over is 1 up to rounding, it keeps its own value
+
+    def __len__(self):
+        return len(self.values)
+
+    def draw(self, rng: np.random.Generator, n: int = None):
+        """One value, or an array of `n` values, drawn from `rng`: pick a slot, keep its value or take its alias."""
+        u = rng.random() * len(self) if n is None else rng.random(n) * len(self)
+        slot = np.minimum(np.floor(u), len(self) - 1).astype(np.intp)  ## u * n can round up to n
+        chosen = np.where(u - slot < self.keep[slot], slot, self.alias[slot])
+        return self.values[chosen] if n is not None else self.values[int(chosen)].item()
+
+
+def _convolve(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """The full convolution of `a` and `b`, by FFT once direct convolution gets expensive."""
+    if len(a) * len(b) <= 4096: return np.convolve(a, b)
+    size = len(a) + len(b) - 1
+    result = np.clip(np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size), 0.0, None)  ## no negative noise
+    return result * (a.sum() * b.sum() / result.sum())  ## the mass the clipping added back out, small tails kept
 
 
 # TODO mike@carif.io: @dataclass? My intuition is no.
@@ -643,14 +756,126 @@ class Roll:
 
     A given roll is a tuple of faces. The cardinality of the tuple is the number of die (Dices) in the instance constructor `__init__`.
     Note that order of the tuple is the order of die from `__init__`. In many cases, e.g. craps, the order of appearance doesn't matter, but it could in other games.
+
+    Rolling dice one at a time is slow in python, so `roll()` serves throws out of a block of `block_size` throws generated in bulk
+    by `roll_batch()`. When the block is used up, it's refilled. Callers see one tuple per `roll()` as before.
+
+    Given an `rng`, all the dice draw from that one stream, which makes the roll reproducible and lets `get_state()`
+    snapshot it. Otherwise each dice draws from its own generator.
+
+    The rules only look at the total. `distribution()` is the exact distribution of the total, and a roll made with
+    `totals=True` draws the total directly from it with an `AliasTable`, one draw per throw instead of one per dice.
+    Its throws are 1-tuples `(total,)`, so `sum(roll.roll())` is the same total and a `Recorder` takes `dice=1`.
     """
 
-    def __init__(self, dice=None):
+    block_size = 4096  ## number of throws generated per refill of the roll() buffer
+
+    def __init__(self, dice=None, block_size: int = None, rng=None, totals: bool = False):
         self.dice = dice or [Dice(), Dice()]  ## `None` signals "use the defaults"
+        if block_size: self.block_size = block_size
+        self.totals = totals
+        self._distribution = None  ## (totals, probabilities), computed on first use, @see distribution()
+        self._alias = None  ## the AliasTable of the totals, built on the first draw of a totals roll
+        self.seed(rng)
+
+    def _total_pmf(self) -> (np.ndarray, np.ndarray):
+        """The totals from smallest to largest possible and the probability of each, cached."""
+        if self._distribution is None:
+            low, pmf = 0, np.ones(1)
+            for d in self.dice:
+                faces = np.asarray(d.values)
+                if faces.dtype.kind not in 'iu': raise ValueError(f'totals need integer faces, got {d.values}')
+                p = getattr(d, 'p', None)  ## @see pycraps_variance.TiltedDice, dice are fair otherwise
+                p = np.full(len(faces), 1.0 / len(faces)) if p is None else np.asarray(p, dtype=float)
+                low += int(faces.min())
+                pmf = _convolve(pmf, np.bincount(faces - faces.min(), weights=p))
+            self._distribution = (np.arange(low, low + len(pmf)), pmf / pmf.sum())
+        return self._distribution
+
+    def distribution(self) -> dict:
+        """The exact probability of every total of the dice, {total: p}, by convolving the dice's faces."""
+        totals, pmf = self._total_pmf()
+        return {total: p for total, p in zip(totals.tolist(), pmf.tolist()) if p > 0}
+
+    def seed(self, rng=None):
+        """
+        Draw from `rng` from now on, @see spawn() for the kinds of rng. Throws already buffered are dropped. Without
+        `rng` the throws come from the dice's generators, or from a private generator seeded from the shared one when
+        all the dice share it, so set_state() never rewinds the other rolls' stream.
+        """
+        if rng is None and all(d.rng is _rng for d in self.dice):
+            rng = shared_rng().integers(1 << 63, size=2)  ## 126 bits of the shared stream, @see shared_rng()
+        self.rng = None if rng is None else np.random.default_rng(rng)
+        self._block = []  ## pre-generated throws (tuples) served by roll()
+        self._cursor = 0  ## index of the next throw in _block
+        self._block_state = None  ## the generators' states just before _block was drawn, @see get_state()
+        return self
+
+    def _generators(self) -> List[np.random.Generator]:
+        """The distinct generators the throws are drawn from."""
+        if self.rng is not None: return [self.rng]
+        return list({id(d.rng): d.rng for d in self.dice}.values())
+
+    def _draw(self, n: int) -> np.ndarray:
+        """Draw `n` throws from the dice, bypassing any limits subclasses put on `roll()` and `roll_batch()`."""
+        if self.totals:
+            if self._alias is None: self._alias = AliasTable(*self._total_pmf())
+            return self._alias.draw(self.rng or self._generators()[0], n)[:, None]
+        return np.column_stack([d.roll_batch(n, rng=self.rng) for d in self.dice])
+
+    def roll_batch(self, n: int) -> np.ndarray:
+        """Return `n` throws at once as an array of faces with shape (n, len(self.dice))."""
+        return self._draw(n)
+
+    def _refill(self, n: int = None):
+        """Replace the used up block with `n` fresh throws, `block_size` by default."""
+        self._block_state = [g.bit_generator.state for g in self._generators()]
+        self._block = list(map(tuple, self._draw(n or self.block_size).tolist()))
+        self._cursor = 0
+
+    def reset(self):
+        """Nothing to reset, @see FixedRoll"""
+
+    def get_state(self) -> dict:
+        """
+        A snapshot of where the roll is in its random stream(s), plain python data that can be saved as JSON.
+        `set_state()` with the snapshot continues the roll with exactly the throws that followed the snapshot.
+        """
+        if self._block_state is None:
+            return dict(generators=[g.bit_generator.state for g in self._generators()], cursor=0, block=0)
+        return dict(generators=self._block_state, cursor=self._cursor, block=len(self._block))
+
+    def set_state(self, state: dict):
+        """Restore a snapshot from `get_state()`. The roll must draw from the same number of generators as it did then."""
+        generators = self._generators()
+        if any(g is _rng for g in generators):
+            raise ValueError('some dice draw from the shared generator, restoring it would rewind every roll using it; '
+                             'seed the roll or its dice')
+        if len(generators) != len(state['generators']):
+            raise ValueError(f"state has {len(state['generators'])} generators, roll has {len(generators)}")
+        for g, g_state in zip(generators, state['generators']): g.bit_generator.state = g_state
+        self._block, self._cursor, self._block_state = [], 0, None
+        if state['cursor']:  ## redraw the block the snapshot was taken in, then skip what was already served
+            self._refill(state['block'])
+            self._cursor = state['cursor']
+        return self
+
+    def __getstate__(self):
+        """Pickle the snapshot instead of the buffered throws, which keeps a pickled roll small. @see Checkpoint"""
+        state = dict(self.__dict__, _block=[], _snapshot=self.get_state())
+        return state
+
+    def __setstate__(self, state: dict):
+        snapshot = state.pop('_snapshot')
+        self.__dict__.update(state)
+        self.set_state(snapshot)
 
     def roll(self):
         """Return a tuple of die faces"""
-        return tuple(d.roll() for d in self.dice)  ## note: len(result) == 2 always
+        if self._cursor >= len(self._block): self._refill()
+        result = self._block[self._cursor]
+        self._cursor += 1
+        return result  ## note: len(result) == len(self.dice) always
 
 
 class FixedRoll(Roll):
@@ -662,8 +887,8 @@ class FixedRoll(Roll):
     _max_rolls = 100
     _roll_counter = 0
 
-    def __init__(self, max_rolls = 100, dice=None):
-        super().__init__(dice)
+    def __init__(self, max_rolls = 100, dice=None, rng=None, block_size: int = None, totals: bool = False):
+        super().__init__(dice, block_size=block_size, rng=rng, totals=totals)
         self._max_rolls = max_rolls
         self.reset()
 
@@ -680,11 +905,26 @@ class FixedRoll(Roll):
         self._roll_counter += 1
         return super().roll()
 
+    def roll_batch(self, n: int) -> np.ndarray:
+        """Batched rolls count against `max_rolls` just like `roll()` does."""
+        if self._roll_counter + n > self.max_rolls + 1:
+            raise ValueError(f'too many rolls')
+        self._roll_counter += n
+        return super().roll_batch(n)
+
+    def get_state(self) -> dict:
+        return dict(super().get_state(), roll_counter=self._roll_counter)
+
+    def set_state(self, state: dict):
+        super().set_state(state)
+        self._roll_counter = state['roll_counter']
+        return self
+
 class SequenceRoll(Roll):
     """
-    A sequence roll is basically a predefined sequence of rolls that are served up by the `roll()` function using
-    the python generator pattern. The sequence is populated by the constructor `__init__`. This is useful for testing
-    `win()` since the same sequence of rolls is always returned by the `roll()` function.
+    A sequence roll is basically a predefined sequence of rolls that are served up by the `roll()` function one at a
+    time. The sequence is populated by the constructor `__init__`. This is useful for testing `win()` and replaying a
+    game since the same sequence of rolls is always returned by the `roll()` function. `seek()` jumps to any roll.
     """
 
     def __init__(self, seq: List[tuple]):
@@ -693,31 +933,84 @@ class SequenceRoll(Roll):
         assert all(len(s) == cardinality for s in seq[1:])  # All the rolls in seq must have the same cardinality
         # super().__init__()  ## not needed currently
         self.seq = seq
+        self.position = 0  ## the index of the next roll in seq
+
+    def __len__(self):
+        return len(self.seq)
+
+    def seek(self, position: int):
+        """Serve `seq[position]` next."""
+        if not 0 <= position <= len(self.seq): raise ValueError(f'no roll {position} in {len(self.seq)} rolls')
+        self.position = position
+        return self
 
     def roll(self):
         """
-        Return the next roll from the pre-defined sequence of rolls. Use a generator to clarify the edge condition that
-        you've run out of rolls.
-        :return:
+        Return the next roll from the pre-defined sequence of rolls as a tuple.
+        :return: tuple, or None once you've run out of rolls. game() stops with a ValueError then.
         """
-        try:
-            for s in self.seq:
-                yield s
-        except StopIteration as si:
-            # You called roll after using up the sequence. return None
-            return None
+        if self.position >= len(self.seq): return None
+        self.position += 1
+        return tuple(self.seq[self.position - 1])
+
+    def get_state(self) -> dict:
+        return dict(position=self.position)
+
+    def set_state(self, state: dict):
+        return self.seek(state['position'])
+
+
+class ReplayRoll(SequenceRoll):
+    """
+    A SequenceRoll over an array of recorded throws, shape (throws, dice), e.g. `MappedSequenceGame.records['faces']`.
+    The throws are decoded to tuples `block_size` at a time, so a memory mapped recording is never read in full.
+    """
+
+    block_size = 4096
+
+    def __init__(self, faces: np.ndarray, block_size: int = None):
+        self.seq = faces
+        if block_size: self.block_size = block_size
+        self.seek(0)
+
+    def seek(self, position: int):
+        super().seek(position)
+        self._block, self._start = [], position  ## the decoded throws, from faces[_start]
+        return self
+
+    def roll(self):
+        offset = self.position - self._start
+        if offset >= len(self._block):
+            if self.position >= len(self.seq): return None
+            self._start, offset = self.position, 0
+            self._block = list(map(tuple, self.seq[self.position:self.position + self.block_size].tolist()))
+        self.position += 1
+        return self._block[offset]
+
 
 class SequenceGame:
     """
-    The sequence of rolls by player for a game. This can be used to replay a game.
+    The sequence of rolls by player for a game. This can be used to replay a game: like the other rolls, `roll()`
+    returns one throw per call, so a SequenceGame can be passed to game() as its `roll`.
     """
 
     # TODO mike@carif.io: only python built-in types can hint?
     def __init__(self, players:List, seq:List[dict]):
         self.seq = seq
+        self._rolls = None  ## the iterator roll() serves the throws from, @see rolls()
 
     def roll(self):
+        """The next throw, a tuple. None once you've run out of rolls, game() stops with a ValueError then."""
+        if self._rolls is None: self._rolls = self.rolls()
+        return next(self._rolls, None)
+
+    def reset(self):
+        """Nothing to reset, the throws go on across rounds. @see FixedRoll"""
+
+    def rolls(self):
         """
+        All the throws from the first, a tuple each, independent of roll().
+
         mike = Shooter('Mike')
         guido = Shooter('Guido')
 
@@ -727,12 +1020,89 @@ class SequenceGame:
                                               dict(shooter=g, rolls=[(1, 1)])])
         :return:
         """
-        try:
-            for i in self.seq:
-                for r in i['rolls']:
-                    yield r
-        except StopIteration as si:
-            return None
+        for i in self.seq:
+            for r in i['rolls']:
+                yield tuple(r)
+
+
+class MappedSequenceGame(SequenceGame):
+    """
+    A SequenceGame replayed from a binary recording written by a `Recorder`. The file is memory mapped and the rolls are
+    decoded lazily, `chunk` records at a time, so a recording much bigger than RAM can be replayed or scanned.
+
+    The raw records are in `records`, a numpy structured array (memmap) with the fields `seat` (the shooter's index in
+    the game's shooters), `faces`, `point` (the point after the roll, 0 when off) and `payout` (the roll's decision as a
+    `BetPayout`, @see DECIDED, not 0 when it decided the round).
+    """
+
+    def __init__(self, path: str, players: List = None, chunk: int = 65_536):
+        with open(path, 'rb') as f:
+            header = f.read(RECORD_HEADER.itemsize)
+        header = np.frombuffer(header, dtype=RECORD_HEADER)[0]
+        if header['magic'] != RECORD_MAGIC: raise ValueError(f'{path} is not a pycraps recording')
+        self.players = players
+        self.chunk = chunk
+        self._rolls = None  ## @see SequenceGame.roll()
+        self.records = np.memmap(path, dtype=record_dtype(int(header['dice'])), mode='r', offset=RECORD_HEADER.itemsize)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def seq(self):
+        """The rounds, decoded lazily, in the same form as `SequenceGame.seq`: dict(shooter=..., rolls=[...])."""
+        rolls, seat = [], None
+        for start in range(0, len(self.records), self.chunk):
+            chunk = self.records[start:start + self.chunk]
+            for seat, faces, payout in zip(chunk['seat'].tolist(), chunk['faces'].tolist(), chunk['payout'].tolist()):
+                rolls.append(tuple(faces))
+                if payout:  ## the round is decided
+                    yield dict(shooter=self.players[seat] if self.players else seat, rolls=rolls)
+                    rolls = []
+        if rolls: yield dict(shooter=self.players[seat] if self.players else seat, rolls=rolls)  ## an unfinished round
+
+    def rolls(self):
+        """The recorded rolls as tuples of faces, decoded lazily."""
+        for start in range(0, len(self.records), self.chunk):
+            yield from map(tuple, self.records['faces'][start:start + self.chunk].tolist())
+
+
+class ThrowHistory:
+    """
+    The latest `cap` throws, kept in a fixed amount of memory no matter how many throws there are. Throws are stored as rows
+    of a compact array of faces rather than as tuples. A `cap` of 0 turns the history off.
+
+    Every throw is written twice, at slot i and slot i + cap of a 2 * cap row buffer. That way the latest throws are always
+    one contiguous slice of the buffer, and `array()` hands them out as a view without copying.
+    """
+
+    def __init__(self, cap: int = 1024):
+        if cap < 0: raise ValueError(f'cap must not be negative, got {cap}')
+        self.cap = cap
+        self._buffer = None  ## allocated on the first throw, when the number of dice is known
+        self._count = 0  ## the number of throws ever appended
+
+    def __len__(self):
+        return min(self._count, self.cap)
+
+    def append(self, throw):
+        if not self.cap: return  ## off
+        if self._buffer is None:
+            faces = np.asarray(throw)
+            dtype = np.int16 if faces.dtype.kind in 'iu' else faces.dtype  ## dice faces are small numbers
+            self._buffer = np.empty((2 * self.cap, len(throw)), dtype=dtype)
+        slot = self._count % self.cap
+        self._buffer[slot] = self._buffer[slot + self.cap] = throw
+        self._count += 1
+
+    def array(self) -> np.ndarray:
+        """The latest throws, oldest first, as a read only (throws, dice) view."""
+        if self._buffer is None: return np.empty((0, 0), dtype=np.int16)
+        start = (self._count - len(self)) % self.cap
+        view = self._buffer[start:start + len(self)]
+        view.flags.writeable = False
+        return view
+
 
 @dataclass  ## https://docs.python.org/3/library/dataclasses.html
 class Bettor:
@@ -809,16 +1179,25 @@ class Shooter(Bettor):
         self._current_bet = value
         return self
 
-    _past_throws: List[int] = field(default_factory=list)  ## history of throws
+    _past_throws: ThrowHistory = field(default=None, repr=False, compare=False)  ## history of throws, @see ThrowHistory
 
     @property
     def past_throws(self):
-        return self._past_throws
+        """The remembered throws, oldest first, as a list of tuples. @see history_array() for the compact version."""
+        return [tuple(t) for t in self._past_throws.array().tolist()]
 
     history = past_throws  ## better alias for past_throws
 
-    def __init__(self, name=None, balance: int = None):
+    def history_array(self) -> np.ndarray:
+        """The remembered throws, oldest first, as a read only (throws, dice) array. No copy."""
+        return self._past_throws.array()
+
+    def __init__(self, name=None, balance: int = None, history_cap: int = 1024):
+        """
+        :param history_cap: int, how many of the latest throws to remember, 0 to remember none.
+        """
         super().__init__(name=name, balance=balance)
+        self._past_throws = ThrowHistory(history_cap)
 
     # TODO mike@carif.io: should this be a setter on past_throws? Don't think so.
     def remember(self, dice):
@@ -863,6 +1242,137 @@ class Shooter(Bettor):
         return self  ## fluent
 
 
+class Seat(Shooter):
+    """
+    A shooter whose balance, bet, min and max live in a row of a BettorTable. It reads and writes like any other Shooter,
+    so code written against Shooters works unchanged, but the table can settle all its seats at once.
+    """
+
+    def __init__(self, table: 'BettorTable', index: int, history_cap: int = 0):
+        self._table = table
+        self._index = index
+        self._past_throws = ThrowHistory(history_cap)
+
+    @property
+    def name(self):
+        return self._table.names[self._index]
+
+    @property
+    def current_balance(self):
+        return int(self._table.balance[self._index])
+
+    @current_balance.setter
+    def current_balance(self, value):
+        self._table.update(self._index, value)
+
+    @property
+    def min(self):
+        return int(self._table.min[self._index])
+
+    @property
+    def max(self):
+        return int(self._table.max[self._index])
+
+    @property
+    def current_bet(self):
+        return int(self._table.bet[self._index])
+
+    @current_bet.setter
+    def current_bet(self, value):
+        self._table.bet[self._index] = value
+
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f'Seat(name={self.name!r}, balance={self.current_balance}, bet={self.current_bet})'
+
+
+class BettorTable:
+    """
+    Many shooters as a struct of arrays: a row per shooter in `balance`, `bet`, `min` and `max`, plus the `peak` balance
+    and the worst `drawdown` for the game's statistics. play_round() settles a whole round on a BettorTable with a few
+    vector operations instead of a `win()` or `lose()` per shooter, which matters at tables with thousands of bettors.
+
+    Indexing and iterating yields a Seat per row, a Shooter view on the arrays, so a BettorTable can stand in for the
+    list of shooters anywhere, e.g. `game(shooters=BettorTable.of(1_000, 10_000))`.
+    """
+
+    def __init__(self, names: List[str], balances, history_cap: int = 0):
+        """
+        :param names: the shooters' names, in shooting order.
+        :param balances: each shooter's starting balance in USD, all positive.
+        :param history_cap: how many throws each seat remembers, @see Shooter
+        """
+        balance = np.array(balances, dtype=np.int64)
+        if len(names) != len(balance): raise ValueError(f'{len(names)} names for {len(balance)} balances')
+        if not (balance > 0).all(): raise Exception('Need a positive balance')
+        self.names = list(names)
+        self.balance = balance
+        self.bet = np.zeros_like(balance)
+        self.min = balance.copy()
+        self.max = balance.copy()
+        self.peak = balance.copy()
+        self.drawdown = np.zeros_like(balance)
+        self._seats = [Seat(self, i, history_cap) for i in range(len(balance))]
+
+    @classmethod
+    def of(cls, shooters: int, balance: int = 1_000, **kwargs):
+        """`shooters` shooters named like Table.setup() names them, each starting with `balance`."""
+        return cls([f'shooter{i}' for i in range(shooters)], [balance] * shooters, **kwargs)
+
+    def __len__(self):
+        return len(self._seats)
+
+    def __getitem__(self, index):
+        return self._seats[index]
+
+    def __iter__(self):
+        return iter(self._seats)
+
+    def update(self, index: int, balance: int):
+        """Set one row's balance, tracking its min, max and drawdown like Bettor does."""
+        self.balance[index] = balance
+        self.min[index] = min(self.min[index], balance)
+        self.max[index] = max(self.max[index], balance)
+        self.peak[index] = max(self.peak[index], balance)
+        self.drawdown[index] = max(self.drawdown[index], self.peak[index] - balance)
+
+    def solvent(self, amount: int = 1) -> bool:
+        """Has any shooter at least `amount` left?"""
+        return bool((self.balance >= amount).any())
+
+    def place(self, amount: int) -> np.ndarray:
+        """Everyone who can cover `amount` bets it, everyone else bets nothing. :return: the bettors' mask"""
+        bettors = self.balance >= amount
+        np.multiply(bettors, amount, out=self.bet)
+        return bettors
+
+    def settle(self, multiplier) -> int:
+        """
+        Settle every bet at once: each bettor wins `multiplier` times the bet, a negative multiplier loses it. A
+        fractional multiplier, e.g. 1.5 for 3 to 2, rounds each bettor's winnings to the dollar.
+        :return: int, what the bettors won in total in USD, negative if they lost.
+        """
+        won = self.bet * multiplier
+        if won.dtype != self.balance.dtype: won = np.rint(won).astype(self.balance.dtype)
+        self.balance += won
+        np.minimum(self.min, self.balance, out=self.min)
+        np.maximum(self.max, self.balance, out=self.max)
+        np.maximum(self.peak, self.balance, out=self.peak)
+        np.maximum(self.drawdown, self.peak - self.balance, out=self.drawdown)
+        self.bet[:] = 0
+        return int(won.sum())
+
+    def drawdowns(self) -> dict:
+        """{name: Drawdown} for every shooter, @see Statistics"""
+        result = dict()
+        for name, peak, drawdown in zip(self.names, self.peak.tolist(), self.drawdown.tolist()):
+            result[name] = d = Drawdown()
+            d.peak, d.max_drawdown = peak, drawdown
+        return result
+
+
 # Make the various game states explicit:
 # * Round - did the current_shooter win the round?
 # * DicePass - is it time to pass the dice?
@@ -891,6 +1401,29 @@ class BetPayout(IntEnum):
     DOUBLE = 2
 
 
+CRAPS = frozenset([2, 3, 12])  ## craps totals
+NATURALS = frozenset([7, 11])  ## natural totals, they win the come out roll
+POINTS = (4, 5, 6, 8, 9, 10)  ## the totals of two six sided dice that set the point
+
+
+def _win_rules(total: int, point=None) -> (Round, DicePass, int, BetPayout):
+    """The craps rules behind `win()`, evaluated branch by branch. @see win()"""
+    if point:
+        if total == 7: return (Round.LOSE, DicePass.NEXT, None, BetPayout.LOSE)
+        if total in CRAPS: return (Round.DRAW, DicePass.STAY, point, BetPayout.NONE)
+        if total == point: return (Round.WIN, DicePass.STAY, None, BetPayout.WIN)
+        return (Round.DRAW, DicePass.STAY, point, BetPayout.NONE)
+    else:
+        if total in NATURALS: return (Round.WIN, DicePass.STAY, None, BetPayout.WIN)
+        if total in CRAPS: return (Round.LOSE, DicePass.NEXT, None, BetPayout.LOSE)
+        return (Round.DRAW, DicePass.STAY, total, BetPayout.NONE)
+
+
+# The craps state machine as a transition table: (point, total) -> (Round, DicePass, next point, BetPayout) for every
+#   point (None is "off") and every total of two six sided dice.
+WIN_TABLE = {(point, total): _win_rules(total, point) for point in (None,) + POINTS for total in range(2, 13)}
+
+
 def win(total:int, point = None)->(Round, DicePass, int, BetPayout):
     """
     `win()` implements the craps state machine based on the game rules and the current point value.
@@ -917,113 +1450,891 @@ def win(total:int, point = None)->(Round, DicePass, int, BetPayout):
                    assert point == None
                    assert bet_multipler == 2
 
+    The rules are compiled once into `WIN_TABLE` (below), so `win()` is a single lookup for the usual totals. Anything not in the
+    table, e.g. the totals of more or bigger dice, falls back to evaluating the rules in `_win_rules()`.
     """
-    if point:
-        if total == 7: return (Round.LOSE, DicePass.NEXT, None, BetPayout.LOSE)
-        if total in set([2, 3, 12]): return (Round.DRAW, DicePass.STAY, point, BetPayout.NONE)
-        if total == point: return (Round.WIN, DicePass.STAY, None, BetPayout.WIN)
-        return (Round.DRAW, DicePass.STAY, point, BetPayout.NONE)
+    return WIN_TABLE.get((point, total)) or _win_rules(total, point)
+
+
+def _win_arrays(size: int) -> tuple:
+    """
+    `WIN_TABLE` as four (point, total) indexed arrays for points and totals in `range(size)`: decisions (`Round` values),
+    passes (`DicePass` values), next points (0 for "off") and payouts (`BetPayout` values). Point 0 means the point is off.
+    """
+    decisions, passes, points, payouts = (np.zeros((size, size), dtype=np.int8) for i in range(4))
+    for point in range(size):
+        for total in range(size):
+            decision, dice_pass, next_point, payout = win(total, point or None)
+            decisions[point, total] = decision.value
+            passes[point, total] = dice_pass.value
+            points[point, total] = next_point or 0
+            payouts[point, total] = payout
+    return decisions, passes, points, payouts
+
+
+_win_arrays_cache = dict()  ## size -> _win_arrays(size)
+
+
+def win_many(totals: np.ndarray, points: np.ndarray) -> tuple:
+    """
+    `win()` for whole arrays of totals and points at once, e.g. one entry per simultaneous game.
+
+    :param totals: int array, the current rolls.
+    :param points: int array shaped like totals, the point for each roll, 0 if the point is off.
+    :return: a tuple of four arrays shaped like totals: decisions (`Round` values), passes (`DicePass` values),
+             next points (0 for "off") and payouts (`BetPayout` values).
+
+    Example usage: decisions, passes, points, payouts = win_many(np.array([7, 5, 5]), np.array([0, 0, 5]))
+                   assert list(decisions) == [Round.WIN.value, Round.DRAW.value, Round.WIN.value]
+                   assert list(points) == [0, 5, 0]
+    """
+    totals, points = np.asarray(totals), np.asarray(points)
+    size = max(13, int(totals.max(initial=0)) + 1, int(points.max(initial=0)) + 1)
+    if size not in _win_arrays_cache: _win_arrays_cache[size] = _win_arrays(size)
+    return tuple(table[points, totals] for table in _win_arrays_cache[size])
+
+
+# Rule sets: the bets at a table, declared as data and compiled into one lookup per roll. The round itself still runs on
+#   `win()`, which decides when the round is over and when the dice pass. The bets only decide who pays whom.
+
+POINT = 'point'  ## key of a Bet's `on` table for a total that makes the point
+
+
+@dataclass(frozen=True)
+class Bet:
+    """
+    A bet type, declared by what each total does to it: `off` while the point is off, `on` while the point is on. A
+    total maps to the bet's net payout multiplier, e.g. 1 for even money, 1.5 for 3 to 2, -1 to lose it, 0 to return it.
+    A total that isn't mapped leaves the bet open. In `on`, the key POINT stands for the total that makes the point and
+    can map to a multiplier per point. A `one_roll` bet is decided by the first roll of the round, whatever it is.
+    """
+    name: str
+    off: dict = field(default_factory=dict, hash=False)
+    on: dict = field(default_factory=dict, hash=False)
+    one_roll: bool = False
+
+    def resolve(self, total: int, point=None):
+        """The net payout multiplier if `total` decides this bet with `point`, None if the bet stays open."""
+        if not point: return self.off.get(total)
+        if total == point and POINT in self.on:
+            multiplier = self.on[POINT]
+            return multiplier.get(point) if isinstance(multiplier, dict) else multiplier
+        return self.on.get(total)
+
+
+PASS = Bet('pass', off={7: 1, 11: 1, 2: -1, 3: -1, 12: -1}, on={POINT: 1, 7: -1})  ## with the shooter, what win() pays
+DONT_PASS = Bet('dont_pass', off={2: 1, 3: 1, 12: 0, 7: -1, 11: -1}, on={POINT: -1, 7: 1})  ## against the shooter, 12 pushes
+ODDS = Bet('odds', on={POINT: {4: 2, 10: 2, 5: 1.5, 9: 1.5, 6: 1.2, 8: 1.2}, 7: -1})  ## behind the pass line, true odds
+FIELD = Bet('field', off={2: 2, 12: 2, 3: 1, 4: 1, 9: 1, 10: 1, 11: 1, 5: -1, 6: -1, 7: -1, 8: -1}, one_roll=True)
+BETS = {bet.name: bet for bet in (PASS, DONT_PASS, ODDS, FIELD)}  ## the bets RuleSet.of() knows by name
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    The bets every bettor makes each round, `stakes[i]` times the starting bet on `bets[i]`. A bettor has to cover all
+    of them, their `exposure` times the starting bet.
+
+    The rule set is compiled into `steps`: (open bets, point, total) -> (Round, DicePass, next point, BetPayout, open
+    bets, net payout, decided). The open bets are a bit mask, the net payout is what a bettor wins per starting bet on
+    that roll and decided is the stakes won or lost on that roll, what counts as wagered. Returned bets aren't wagered.
+    So a roll costs one lookup however many bets there are. States outside the two six sided dice are compiled the
+    first time they come up.
+
+    Example: game(..., rules=RuleSet.of(**{'pass': 1}, odds=2))  ## the pass line with double odds, `pass` is a keyword
+    """
+    bets: tuple = (PASS,)
+    stakes: tuple = (1,)
+    rule: object = win  ## decides the rounds, @see win()
+    steps: dict = field(default=None, init=False, repr=False, compare=False, hash=False)
+
+    def __post_init__(self):
+        if len(self.bets) != len(self.stakes): raise ValueError(f'{len(self.bets)} bets for {len(self.stakes)} stakes')
+        if not self.bets or any(stake <= 0 for stake in self.stakes): raise ValueError('need bets with positive stakes')
+        object.__setattr__(self, 'steps', dict())  ## frozen, but the compiled table is a cache
+        for mask in range(1, self.all + 1):
+            for point in (None,) + POINTS:
+                for total in range(2, 13): self.compile(mask, point, total)
+
+    @classmethod
+    def of(cls, **stakes) -> 'RuleSet':
+        """A rule set from bet names in BETS and their stakes, e.g. RuleSet.of(dont_pass=1)."""
+        unknown = stakes.keys() - BETS.keys()
+        if unknown: raise ValueError(f'unknown bets {sorted(unknown)}, pick from {sorted(BETS)}')
+        return cls(tuple(BETS[name] for name in stakes), tuple(stakes.values()))
+
+    @property
+    def all(self) -> int:
+        """The mask of all the bets, open at the start of every round."""
+        return (1 << len(self.bets)) - 1
+
+    @property
+    def exposure(self):
+        return sum(self.stakes)
+
+    def compile(self, mask: int, point, total: int) -> tuple:
+        """Compile the step for `total` with `point` and the bets in `mask` open, @see RuleSet"""
+        decision, dice_pass, next_point, payout = self.rule(total, point)
+        net, closed, decided = 0, 0, 0
+        for i, (bet, stake) in enumerate(zip(self.bets, self.stakes)):
+            if not mask >> i & 1: continue
+            multiplier = bet.resolve(total, point)
+            if multiplier is not None: net += stake * multiplier
+            if multiplier: decided += stake  ## won or lost, not returned
+            if multiplier is not None or bet.one_roll: closed |= 1 << i
+        step = self.steps[(mask, point, total)] = (decision, dice_pass, next_point, payout, mask & ~closed, net, decided)
+        return step
+
+
+# Events: what game() tells its sinks. A sink is any callable taking an event, e.g. `list.append` collects them.
+#   Events are only built when game() has sinks, a game without sinks pays nothing for them. A sink whose `enabled` is
+#   false when the game starts is dropped, a disabled sink costs as little as none.
+
+@dataclass(frozen=True)
+class Event:
+    """Something that happened during a game. `round` counts the game's rounds from 0."""
+    round: int
+
+
+@dataclass(frozen=True)
+class StartEvent(Event):
+    """The game starts."""
+
+
+@dataclass(frozen=True)
+class ShooterEvent(Event):
+    """The dice pass to `shooter`, at index `seat` in the game's shooters."""
+    shooter: 'Shooter'
+    seat: int
+
+
+@dataclass(frozen=True)
+class RollEvent(Event):
+    """
+    `shooter` at index `seat` rolled `faces`, `win()` decided the rest. `payout` is what a starting bet won on this roll:
+    the BetPayout of `win()`, or under a RuleSet the net payout of all the bets the roll decided.
+    """
+    shooter: 'Shooter'
+    seat: int
+    faces: tuple
+    total: int
+    decision: Round
+    dice_pass: DicePass
+    point: int
+    payout: BetPayout
+
+
+@dataclass(frozen=True)
+class PointEvent(Event):
+    """`shooter` set the `point`."""
+    shooter: 'Shooter'
+    point: int
+
+
+@dataclass(frozen=True)
+class DecisionEvent(Event):
+    """The round is decided, `shooter` won or lost it. `payout` is what a starting bet won in the round, @see RollEvent"""
+    shooter: 'Shooter'
+    decision: Round
+    payout: BetPayout
+
+
+@dataclass(frozen=True)
+class SettlementEvent(Event):
+    """The bets are settled, `winner` won. `bettors` are the shooters who bet this round."""
+    winner: 'Bettor'
+    house: 'Bettor'
+    bettors: tuple
+
+
+@dataclass(frozen=True)
+class OverEvent(Event):
+    """The game is over after `round` rounds."""
+
+
+class TextSink:
+    """
+    Trace the game as text through `logger`, in the style of the transcripts in interview/runs. Lines below the logger's
+    level are never formatted.
+    """
+
+    def __init__(self, logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger(__name__)
+
+    @property
+    def enabled(self) -> bool:
+        """Would the logger write any line? @see game()"""
+        return self.logger.isEnabledFor(logging.INFO)
+
+    def __call__(self, event: Event):
+        info, debug = self.logger.isEnabledFor(logging.INFO), self.logger.isEnabledFor(logging.DEBUG)
+        if isinstance(event, RollEvent):
+            if info: self.logger.info(f'current shooter {event.shooter.name} shoots: {event.total}')
+            if debug: self.logger.debug(f'decision: {event.decision}, pass: {event.dice_pass}, point: {event.point}, payout: {event.payout}')
+        elif isinstance(event, PointEvent):
+            if debug: self.logger.debug(f"{event.shooter.name}'s point: {event.point}")
+        elif isinstance(event, SettlementEvent):
+            if info:
+                self.logger.info(f"!! {event.winner.name} wins")
+                # Balances at the end of the round.
+                self.logger.info(f"* house: {event.house.current_balance}")
+                for b in event.bettors:
+                    self.logger.info(f"* bettor {b.name}: {b.current_balance}")
+        elif isinstance(event, ShooterEvent):
+            if info: self.logger.info(f"** current shooter: {event.shooter.name}")
+        elif isinstance(event, StartEvent):
+            if info: self.logger.info("Let's play...")
+        elif isinstance(event, OverEvent):
+            if info: self.logger.info("game over")
+
+
+# Binary recordings, written by a Recorder sink and replayed by a MappedSequenceGame. A recording is a fixed header and
+#   then one fixed width record per roll. All little endian.
+RECORD_MAGIC = b'PYCRAPS1'
+DECIDED = {Round.WIN: BetPayout.WIN, Round.LOSE: BetPayout.LOSE, Round.DRAW: BetPayout.NONE}  ## a roll's recorded payout
+RECORD_HEADER = np.dtype([('magic', 'S8'), ('dice', '<u2'), ('reserved', 'V6')])
+
+
+def record_dtype(dice: int = 2) -> np.dtype:
+    """The record of a roll of `dice` dice: shooter seat, faces, point after the roll, BetPayout of the roll."""
+    return np.dtype([('seat', '<u2'), ('faces', 'u1', (dice,)), ('point', 'u1'), ('payout', 'i1')])
+
+
+class Recorder:
+    """
+    A sink that records every roll of a game to the binary file `path`, @see MappedSequenceGame to replay it. Records
+    are buffered and written `buffer` at a time. The recorder closes the file when the game is over.
+    """
+
+    def __init__(self, path: str, dice: int = 2, buffer: int = 65_536):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(np.array([(RECORD_MAGIC, dice, b'')], dtype=RECORD_HEADER).tobytes())
+        self._buffer = np.zeros(buffer, dtype=record_dtype(dice))
+        self._count = 0  ## records in _buffer
+
+    def __call__(self, event: Event):
+        if isinstance(event, RollEvent):
+            self._buffer[self._count] = (event.seat, event.faces, event.point or 0, DECIDED[event.decision])
+            self._count += 1
+            if self._count == len(self._buffer): self.flush()
+        elif isinstance(event, OverEvent):
+            self.close()
+
+    def flush(self):
+        self._file.write(self._buffer[:self._count].tobytes())
+        self._count = 0
+
+    def close(self):
+        if self._file.closed: return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SampledSink:
+    """Pass only the events of every `every`-th round on to `sink`. The start and the end of the game always pass."""
+
+    def __init__(self, sink, every: int = 100):
+        if every <= 0: raise ValueError(f'every must be positive, got {every}')
+        self.sink = sink
+        self.every = every
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(self.sink, 'enabled', True)
+
+    def __call__(self, event: Event):
+        if event.round % self.every == 0 or isinstance(event, (StartEvent, OverEvent)):
+            self.sink(event)
+
+
+class Welford:
+    """
+    The running count, mean and variance of a stream of numbers in constant memory, by Welford's algorithm. Two of them
+    merge into the statistics of both streams (Chan et al.), so streams can be summarized separately and combined later.
+    """
+
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0  ## the sum of squared differences from the mean
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        return self  ## fluent
+
+    @property
+    def variance(self) -> float:
+        """The sample variance, 0 for fewer than two numbers."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def merge(self, other: 'Welford'):
+        n = self.n + other.n
+        if n:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.n * other.n / n
+            self.mean += delta * other.n / n
+            self.n = n
+        return self  ## fluent
+
+    def __eq__(self, other):
+        return isinstance(other, Welford) and (self.n, self.mean, self.m2) == (other.n, other.mean, other.m2)
+
+    def __repr__(self):
+        return f'Welford(n={self.n}, mean={self.mean}, variance={self.variance})'
+
+
+class Drawdown:
+    """The highest balance seen and the biggest drop from a highest balance to a later balance, in USD."""
+
+    __slots__ = ('peak', 'max_drawdown')
+
+    def __init__(self):
+        self.peak = None
+        self.max_drawdown = 0
+
+    def add(self, balance: int):
+        if self.peak is None or balance > self.peak: self.peak = balance
+        elif self.peak - balance > self.max_drawdown: self.max_drawdown = self.peak - balance
+        return self  ## fluent
+
+    def merge(self, other: 'Drawdown'):
+        """Drawdowns of separate games merge to the worst of them."""
+        if other.peak is not None and (self.peak is None or other.peak > self.peak): self.peak = other.peak
+        self.max_drawdown = max(self.max_drawdown, other.max_drawdown)
+        return self  ## fluent
+
+    def __eq__(self, other):
+        return isinstance(other, Drawdown) and (self.peak, self.max_drawdown) == (other.peak, other.max_drawdown)
+
+    def __repr__(self):
+        return f'Drawdown(peak={self.peak}, max_drawdown={self.max_drawdown})'
+
+
+def _merge_value(mine, theirs):
+    """Merge one statistic into another, @see Statistics.merge()"""
+    if isinstance(mine, dict):
+        for k, v in theirs.items():
+            mine[k] = _merge_value(mine[k], v) if k in mine else copy.deepcopy(v)
+        return mine
+    if hasattr(mine, 'merge'): return mine.merge(theirs)
+    if isinstance(mine, list): return [a + b for a, b in zip(mine, theirs)]
+    return mine + theirs
+
+
+class Statistics(dict):
+    """
+    The statistics game() returns, updated as the game runs in constant memory however long the game gets:
+
+    * counts: `games`, `rounds`, `rolls`, `wagered` (USD bet), `house_net` (what the house won in USD),
+      `house_busted`, `shooters_busted` and `stalled` (how the game ended, stalled when nobody can bet anymore).
+    * `outcomes`: Welford, mean and variance of what the house won per round in USD.
+    * `totals`: {total: rolls}, the histogram of the roll totals.
+    * `shooters`: {name: [rounds, rolls]}, what each shooter shot.
+    * `points`: {point: [set, made]}, how often each point was set and how often it was made.
+    * `drawdowns`: {name: Drawdown}, the worst drawdown of each bettor including the house.
+
+    It's a dict, so statistics read like they always did. `merge()` combines the statistics of many games cheaply,
+    `summary()` turns them into plain numbers.
+    """
+
+    COUNTS = ('games', 'rounds', 'rolls', 'wagered', 'house_net', 'house_busted', 'shooters_busted', 'stalled')
+
+    def __init__(self):
+        super().__init__((count, 0) for count in self.COUNTS)
+        self['outcomes'] = Welford()
+        self['totals'] = dict()
+        self['shooters'] = dict()
+        self['points'] = dict()
+        self['drawdowns'] = dict()
+
+    def merge(self, other: dict):
+        """Merge the statistics of other games into these: counts add up, accumulators merge. Returns self."""
+        _merge_value(self, other)
+        return self  ## fluent
+
+    def drawdown(self, bettor: 'Bettor'):
+        """Track `bettor`'s current balance for its drawdown."""
+        drawdowns = self['drawdowns']
+        if bettor.name not in drawdowns: drawdowns[bettor.name] = Drawdown()
+        drawdowns[bettor.name].add(bettor.current_balance)
+
+    def summary(self) -> dict:
+        """The statistics as plain numbers, e.g. for printing or JSON."""
+        return dict({count: self[count] for count in self.COUNTS},
+                    outcome_mean=self['outcomes'].mean,
+                    outcome_variance=self['outcomes'].variance,
+                    totals=dict(sorted(self['totals'].items())),
+                    shooters={name: dict(rounds=r, rolls=n) for name, (r, n) in self['shooters'].items()},
+                    point_hit_rates={point: made / set_ for point, (set_, made) in sorted(self['points'].items())},
+                    max_drawdowns={name: d.max_drawdown for name, d in self['drawdowns'].items()})
+
+
+def _emit(sinks, event: Event):
+    """Tell every sink about `event`."""
+    for sink in sinks: sink(event)
+
+
+class Profiler:
+    """
+    Opt-in timing of the phases of play_round(), pass one to game(). Each phase's cumulative time, by
+    `time.perf_counter_ns()`, and number of calls:
+
+    * `bet`: picking the bettors who can cover the bet and placing their bets.
+    * `roll`: rolling the dice.
+    * `decide`: deciding the roll with `win()` or the RuleSet.
+    * `events`: telling the sinks, e.g. the logging done by a TextSink.
+    * `settle`: moving the money between the bettors and the house.
+    * `statistics`: updating the game's statistics.
+
+    With `every=k` only every k-th round is timed, which keeps the clock calls out of the other rounds. `rounds` counts
+    all the rounds, `sampled` the timed ones. A game without a profiler pays one branch per phase.
+    """
+
+    PHASES = ('bet', 'roll', 'decide', 'events', 'settle', 'statistics')
+
+    def __init__(self, every: int = 1):
+        if every <= 0: raise ValueError(f'need a positive sampling interval, got {every}')
+        self.every = every
+        self.ns = dict.fromkeys(self.PHASES, 0)
+        self.calls = dict.fromkeys(self.PHASES, 0)
+        self.rounds = 0
+        self.sampled = 0
+
+    def sample(self) -> bool:
+        """Start a round, returns whether to time it."""
+        self.rounds += 1
+        if (self.rounds - 1) % self.every: return False
+        self.sampled += 1
+        return True
+
+    def lap(self, phase: str, since: int) -> int:
+        """Charge the time since `since` to `phase`, returns now for the next phase."""
+        now = time.perf_counter_ns()
+        self.ns[phase] += now - since
+        self.calls[phase] += 1
+        return now
+
+    def as_dict(self) -> dict:
+        """{phase: {ns, calls, share}} plus `rounds`, `sampled` and `every`. `share` is the phase's part of the total."""
+        total = sum(self.ns.values()) or 1
+        return dict({phase: dict(ns=self.ns[phase], calls=self.calls[phase], share=self.ns[phase] / total)
+                     for phase in self.PHASES}, rounds=self.rounds, sampled=self.sampled, every=self.every)
+
+    def collapsed(self, root: str = 'game;play_round') -> str:
+        """The phases as collapsed stacks, a `root;phase ns` line each, the input of flamegraph.pl and speedscope."""
+        return ''.join(f'{root};{phase} {self.ns[phase]}\n' for phase in self.PHASES if self.ns[phase])
+
+
+def _play_round(roll, house, current_shooter, shooters, starting_bet=100, statistics: Statistics = None, sinks=None, seat=0,
+                rules: RuleSet = None, profiler: Profiler = None):
+    """
+    Play a single round: every shooter who can cover `starting_bet` bets it, `current_shooter` rolls until `win()` decides
+    the round, then the bets are settled between the bettors and the house. The settlement never waits on anything, so
+    it's atomic with respect to other rounds interleaved with this one, e.g. tables sharing a house in asyncio tasks.
+    With `rules`, every shooter who can cover all of its bets makes them and they are settled together at the end.
+
+    :param roll: the dice, @see game()
+    :param house: the house, @see game()
+    :param current_shooter: the shooter rolling the dice, one of `shooters`.
+    :param shooters: everyone at the table, @see game()
+    :param starting_bet: what every bettor bets.
+    :param statistics: Statistics, the game's statistics, updated in place.
+    :param sinks: @see game()
+    :param seat: the index of `current_shooter` in `shooters`, for the events.
+    :param rules: RuleSet, the bets, `None` for the pass line as `win()` pays it.
+    :param profiler: Profiler|None, times the phases of the round.
+    :return: (Round, DicePass, BetPayout, point), the decision on the round, whether the dice pass, the payout and the
+             point the round set, `None` if the come out roll decided it. Under `rules` the payout is the round's net
+             payout per starting bet, what the money moved.
+    """
+    point = None  ## point is truthy.
+    decision = Round.DRAW  ## no decision yet.
+    winner = None  ## assign the winner when decision above is Round.WIN or Round.LOSE
+    payout = BetPayout.NONE
+    set_point = None  ## the point this round set, if any
+    rolls = 0  ## rolls in this round
+    totals = statistics['totals']
+    house_before = house.current_balance
+    roll.reset()
+    timed = profiler is not None and profiler.sample()
+    if timed: clock = time.perf_counter_ns()
+    stake = starting_bet
+    if rules is not None:
+        steps, open_bets, net, decided = rules.steps, rules.all, 0, 0  ## @see RuleSet
+        stake = starting_bet * rules.exposure
+    # Who can cover the starting bet?
+    seats = isinstance(shooters, BettorTable)  ## settle the whole table at once, @see BettorTable
+    if seats:
+        bettors = shooters.place(stake)
     else:
-        if total in set([7, 11]): return (Round.WIN, DicePass.STAY, None, BetPayout.WIN)
-        if total in set([2, 3, 12]): return (Round.LOSE, DicePass.NEXT, None, BetPayout.LOSE)
-        return (Round.DRAW, DicePass.STAY, total, BetPayout.NONE)
+        bettors = list(s for s in shooters if
+                       s.current_balance >= stake)  ## bettors are all shooters who can cover the starting_bet. At least the current shooter can.
+        for b in bettors: b.current_bet = stake  ## all bettors bet the starting bet
+    if timed: clock = profiler.lap('bet', clock)
+
+    while decision == Round.DRAW:
+
+        # Initial roll
+        r = roll.roll()
+        # roll.roll() can return None for SequenceRolls. Means you ran out of rolls for replaying a game.
+        if not isinstance(r, tuple):
+            raise ValueError(f"Expecting tuple, got {type(r)}")
+
+        total = sum(r)
+        rolls += 1
+        totals[total] = totals.get(total, 0) + 1
+        if timed: clock = profiler.lap('roll', clock)
+
+        if rules is None:
+            decision, dice_pass, point, payout = win(total, point)
+        else:
+            step = steps.get((open_bets, point, total)) or rules.compile(open_bets, point, total)
+            decision, dice_pass, point, payout, open_bets, won, stakes = step
+            net += won
+            decided += stakes
+        if point and not set_point: set_point = point
+        if timed: clock = profiler.lap('decide', clock)
+        if sinks:
+            _emit(sinks, RollEvent(statistics['rounds'], current_shooter, seat, r, total, decision, dice_pass, point,
+                                   payout if rules is None else won))
+            ## the point is only ever this roll's total when this roll set it
+            if point == total and decision == Round.DRAW: _emit(sinks, PointEvent(statistics['rounds'], current_shooter, point))
+            if decision != Round.DRAW: _emit(sinks, DecisionEvent(statistics['rounds'], current_shooter, decision,
+                                                                  payout if rules is None else net))
+            if timed: clock = profiler.lap('events', clock)
+
+    # End the round with payouts, moving money to/from the various bettors.
+    winnings = int(shooters.bet.sum()) if seats else sum(b.current_bet for b in bettors)
+    if rules is None: statistics['wagered'] += winnings
+    else: statistics['wagered'] += round(winnings * decided / rules.exposure)  ## the bets decided, not those returned
+    if rules is not None:
+        # Everyone made the same bets, they all win or lose the same. Bets still open are returned.
+        winner = current_shooter if decision == Round.WIN else house
+        amount = round(net * starting_bet)
+        if seats: house.lose(shooters.settle(net / rules.exposure))
+        else:
+            for b in bettors: b.win(amount)
+            house.lose(amount * len(bettors))
+    elif decision == Round.WIN:
+        # Hose loses, all bettors win double.
+        winner = current_shooter
+        house.lose(payout * winnings)
+        if seats: shooters.settle(payout)
+        else:
+            for b in bettors: b.win(payout * b.current_bet)
+    else:
+        # House wins, all bettors lose.
+        winner = house
+        if seats: shooters.settle(-1)
+        else:
+            for b in bettors: b.lose()
+        house.win(winnings)
+
+    if timed: clock = profiler.lap('settle', clock)
+    if sinks:
+        if seats: bettors = [shooters[i] for i in np.flatnonzero(bettors)]  ## the views only when someone listens
+        _emit(sinks, SettlementEvent(statistics['rounds'], winner, house, tuple(bettors)))
+        if timed: clock = profiler.lap('events', clock)
+    statistics['rounds'] += 1
+    statistics['rolls'] += rolls
+    statistics['outcomes'].add(house.current_balance - house_before)
+    shot = statistics['shooters'].setdefault(current_shooter.name, [0, 0])
+    shot[0] += 1
+    shot[1] += rolls
+    if set_point:
+        tally = statistics['points'].setdefault(set_point, [0, 0])
+        tally[0] += 1
+        tally[1] += decision == Round.WIN
+    statistics.drawdown(house)
+    if not seats:  ## a BettorTable tracks its own drawdowns
+        for b in bettors: statistics.drawdown(b)
+    if timed: profiler.lap('statistics', clock)
+    return decision, dice_pass, payout if rules is None else net, set_point
+
+
+def play_round(roll, house, current_shooter, shooters, starting_bet=100, statistics: Statistics = None, sinks=None, seat=0,
+               rules: RuleSet = None):
+    """
+    Play a single round, @see _play_round() for the parameters. Without `statistics` the round counts in a fresh
+    Statistics that's thrown away.
+    :return: (Round, DicePass, BetPayout), the decision on the round, whether the dice pass and the payout, @see
+             _play_round()
+    """
+    if statistics is None: statistics = Statistics()
+    return _play_round(roll, house, current_shooter, shooters, starting_bet, statistics, sinks, seat, rules)[:3]
 
 
+class Checkpoint:
+    """
+    Periodic snapshots of a running game, so a killed game can `resume()` where the last snapshot left it.
+
+    game() offers a snapshot after every round, between rounds the point is always off. One is written when `every`
+    rounds or `seconds` seconds have passed since the last one. A snapshot is the whole game state: where the shooters'
+    cycle is and whether the current shooter keeps the dice, the house and the shooters with their balances, mins, maxs
+    and histories, the roll with its random stream (@see Roll.get_state()) and FixedRoll counter, the rules and the
+    statistics so far. It's pickled to a temporary file next to `path`, which then replaces `path` in one step, so a
+    crash mid write leaves the previous snapshot intact.
+    """
 
+    VERSION = 1  ## the snapshot format
 
-def game(roll=FixedRoll(), house=None, shooters=None, starting_bet=100):
+    def __init__(self, path: str, every: int = 1000, seconds: float = None):
+        """
+        :param path: str, the snapshot file, overwritten by every snapshot.
+        :param every: int, rounds between snapshots.
+        :param seconds: float|None, also snapshot when this many seconds passed since the last one.
+        """
+        if every <= 0: raise ValueError(f'need a positive number of rounds between checkpoints, got {every}')
+        self.path = path
+        self.every = every
+        self.seconds = seconds
+        self._rounds = 0  ## the rounds at the last snapshot
+        self._time = time.monotonic()
+        self.saved = 0  ## snapshots written
+
+    def due(self, rounds: int) -> bool:
+        """Is a snapshot due after `rounds` rounds?"""
+        return rounds - self._rounds >= self.every or (self.seconds is not None and time.monotonic() - self._time >= self.seconds)
+
+    def save(self, state: dict):
+        """Write `state` atomically, @see game() for what's in it."""
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(dict(state, version=self.VERSION), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self._rounds, self._time = state['statistics']['rounds'], time.monotonic()
+        self.saved += 1
+
+    @classmethod
+    def load(cls, path: str) -> dict:
+        """Read a snapshot back. Only load snapshots you wrote yourself, they're pickles."""
+        with open(path, 'rb') as f: state = pickle.load(f)
+        if state.get('version') != cls.VERSION:
+            raise ValueError(f'{path} is a version {state.get("version")} checkpoint, expected version {cls.VERSION}')
+        return state
+
+
+class RoundRecord(NamedTuple):
+    """
+    A decided round, as game_rounds() yields it, a plain tuple that's cheap to build every round. `round` counts the
+    game's rounds from 0, `shooter` is the name of the shooter at index `seat`, `rolls` the rolls the round took and
+    `point` the point it set, 0 if the come out roll decided it. `dice_pass` says whether the shooter keeps the dice.
+    `payout` is what a starting bet won in the round, @see RollEvent. `house` and `balances`, one per seat, are the
+    balances after the settlement, `None` unless asked for.
     """
-    Play a game (of craps).
+    round: int
+    seat: int
+    shooter: str
+    rolls: int
+    point: int
+    decision: Round
+    dice_pass: DicePass
+    payout: BetPayout
+    house: int
+    balances: tuple
+
+
+def game(roll=None, house=None, shooters=None, starting_bet=100, sinks=None, rng=None, rules: RuleSet = None,
+         checkpoint: Checkpoint = None, state: dict = None, profiler: Profiler = None):
+    """
+    Play a game (of craps) to the end, @see game_rounds() to watch it a round at a time.
 
-    :param roll: The (required) dice that run the game. All shooters roll the same dice. The dice is stateless, meaning one roll never effects the next.
+    :param roll: The dice that run the game, `None` for a fresh FixedRoll. All shooters roll the same dice. The dice is stateless, meaning one roll never effects the next.
     :param rules: The explicit rules of this game, TBS. Currently the rules are hardcoded in this function implementation.
     :param house: The (required) house, which takes the bets and pays the winners. The house never shoots.
-    :param shooters: The (required) shooters, one or more. The shooters shoot in order round-robin until either the house is busted or all shooters are busted.
-    :return: statistics:dict, a dictionary of interesting statistics
+    :param shooters: The (required) shooters, one or more. The shooters shoot in order round-robin until either the house is busted or all shooters are busted. A BettorTable settles many shooters faster.
+    :param sinks: The (optional) callables that are told what happens during the game, one `Event` at a time. @see TextSink to trace the game.
+                  Sinks that are disabled when the game starts, e.g. a TextSink whose logger is at WARNING, are dropped.
+    :param rng: The (optional) random stream for `roll`, e.g. a seed to replay a game roll for roll. @see spawn()
+    :param rules: The (optional) bets, e.g. don't pass or odds, @see RuleSet. By default everyone bets the pass line.
+    :param checkpoint: The (optional) Checkpoint that snapshots the game now and then, @see resume()
+    :param state: The (optional) snapshot to continue from, @see resume()
+    :param profiler: The (optional) Profiler that times the phases of every round, or of every k-th round.
+    :return: statistics:dict, a dictionary of interesting statistics, @see Statistics
 
     Note that the shooters are "side-effected" by playing the game, in particular their balances change and their min and max balances are recorded.
 
+    """
+    return finish(_game(roll, house, shooters, starting_bet, sinks, rng, rules, checkpoint, state, profiler, False, False))
+
+
+def finish(records) -> Statistics:
+    """Play the rest of a game_rounds() game without looking at its rounds, return the game's statistics."""
+    while True:
+        try:
+            next(records)
+        except StopIteration as over:
+            return over.value
+
+
+def game_rounds(roll=None, house=None, shooters=None, starting_bet=100, sinks=None, rng=None, rules: RuleSet = None,
+                checkpoint: Checkpoint = None, state: dict = None, profiler: Profiler = None, balances: bool = True):
+    """
+    Play a game (of craps) a round at a time: a generator yielding a RoundRecord as soon as each round is decided and
+    settled. The game only goes on while the consumer asks for the next round, so a consumer can watch a long game
+    live, sleep between rounds to throttle it or simply stop, e.g. `islice(game_rounds(...), 100)`. Nothing is kept
+    between rounds but the game's statistics. When the game is over, the generator returns the statistics, @see
+    finish().
+
+    The parameters are game()'s, plus `balances`: copy every seat's balance into each record. That's a tuple as long as
+    the table every round, turn it off for big BettorTables whose consumers only need the rest.
+    """
+    return _game(roll, house, shooters, starting_bet, sinks, rng, rules, checkpoint, state, profiler, True, balances)
+
+
+def _game(roll, house, shooters, starting_bet, sinks, rng, rules, checkpoint, state, profiler, records: bool,
+          balances: bool):
+    """
+    The game loop behind game() and game_rounds(). Without `records` it never yields, game() runs it to the end in a
+    single next() and no round pays for a RoundRecord.
     """
     if not house:
         raise Exception('No house')
     if not shooters:
         raise Exception('no shooters')
-
-    statistics = dict()  ## generate some statics about the game. Gives you something to return
+    if roll is None: roll = FixedRoll()  ## a fresh one per game, not one built at import and shared by every game
+    if rng is not None: roll.seed(rng)
+    if sinks: sinks = [sink for sink in sinks if getattr(sink, 'enabled', True)]  ## disabled sinks cost nothing
+
+    seats = isinstance(shooters, BettorTable)
+    stake = starting_bet * (rules.exposure if rules is not None else 1)  ## what a bettor has to cover, @see play_round()
+    if state:
+        statistics, house_start = state['statistics'], state['house_start']
+        start, stay = state['seat'], state['stay']
+    else:
+        statistics = Statistics()  ## generate some statics about the game. Gives you something to return
+        statistics['games'] = 1
+        house_start = house.current_balance
+        start, stay = 0, False  ## the first shooter, who gets the dice like everyone else
+        statistics.drawdown(house)
+        if not seats:
+            for s in shooters: statistics.drawdown(s)
 
     # Hacky way to announce the game is over.
-    def game_over(result):
-        logger.info("game over")
+    def game_over(result, stalled=0):
+        if sinks: _emit(sinks, OverEvent(result['rounds']))
+        if seats: result['drawdowns'].update(shooters.drawdowns())
+        result['house_net'] = house.current_balance - house_start
+        result['house_busted'] = int(house.current_balance <= 0)
+        result['stalled'] = stalled
+        result['shooters_busted'] = 1 - result['house_busted'] - stalled
         return result
 
     # Let's play! https://www.youtube.com/watch?v=j7uL3DryXkk
-    logger.info("Let's play...")
-    for current_shooter in cycle(shooters):  ## cycle through the shooters forever (see the breaks below)
+    if sinks and not state: _emit(sinks, StartEvent(0))
+    for seat, current_shooter in islice(cycle(enumerate(shooters)), start, None):  ## cycle through the shooters forever (see the breaks below)
 
-        # The game can only continue if the house and some shooter can bet. Testing this on every iteration is a little
-        #   hacky, but it allows for cycle() above.
-        if house.current_balance <= 0: return game_over(statistics)
-        if not any(s for s in shooters if s.current_balance > 0): return game_over(
-            statistics)  ##  if all the shooters are busted, game over. not any == some.
-        if current_shooter.current_balance <= 0: continue  ## current shooter can't shoot without money
-        # Here: current_shooter has enough money to shoot
-
-        logger.info(f"** current shooter: {current_shooter.name}")
+        if stay:
+            stay = False  ## resumed in the middle of this shooter's turn, the checks below were made when the dice came
+        else:
+            # The game can only continue if the house and some shooter can bet. Testing this on every iteration is a little
+            #   hacky, but it allows for cycle() above.
+            if house.current_balance <= 0: return game_over(statistics)
+            if not (shooters.solvent() if seats else any(s for s in shooters if s.current_balance > 0)): return game_over(
+                statistics)  ##  if all the shooters are busted, game over. not any == some.
+            if not (shooters.solvent(stake) if seats else any(s for s in shooters if s.current_balance >= stake)): return game_over(
+                statistics, stalled=1)  ## nobody can bet anymore, the shooters would take turns forever
+            if current_shooter.current_balance <= 0: continue  ## current shooter can't shoot without money
+            # Here: current_shooter has enough money to shoot
+
+            if sinks: _emit(sinks, ShooterEvent(statistics['rounds'], current_shooter, seat))
 
         dice_pass = DicePass.STAY
-        # while the current_shooter ...
+        # while the current_shooter hasn't won or lost
         while dice_pass == DicePass.STAY:
-            #  ... hasn't won or lost
-            point = None  ## point is truthy.
-            decision = Round.DRAW  ## no decision yet.
-            winner = None  ## assign the winner when decision above is Round.WIN or Round.LOSE
-            payout = BetPayout.NONE
-            roll.reset()
-            # Who can cover the starting bet?
-            bettors = list(s for s in shooters if
-                           s.current_balance >= starting_bet)  ## bettors are all shooters who can cover the starting_bet. At least the current shooter can.
-            for b in bettors: b.current_bet = starting_bet  ## all bettors bet the starting bet
-
-
-            while decision == Round.DRAW:
-
-                # Initial roll
-                r = roll.roll()
-                # roll.roll() can return None for SequenceRolls. Means you ran out of rolls for replaying a game.
-                if not isinstance(r, tuple):
-                    raise ValueError(f"Expecting tuple, got {type(r)}")
-
-                total = sum(r)
-                logger.info(f'current shooter {current_shooter.name} shoots: {total}')
-
-                decision, dice_pass, point, payout = win(total, point)
-                logger.debug(f'decision: {decision}, pass: {dice_pass}, point: {point}, payout: {payout}')
-
-            # End the round with payouts, moving money to/from the various bettors.
-            winnings = sum(b.current_bet for b in bettors)
-            if decision == Round.WIN:
-                # Hose loses, all bettors win double.
-                winner = current_shooter
-                house.lose(payout * winnings)
-                for b in bettors: b.win(payout * b.current_bet)
-            else:
-                # House wins, all bettors lose.
-                winner = house
-                for b in bettors: b.lose()
-                house.win(winnings)
-
-            logger.info(f"!! {winner.name} wins")
-            # Balances at the end of the round.
-            logger.info(f"* house: {house.current_balance}")
-            for b in bettors:
-                logger.info(f"* bettor {b.name}: {b.current_balance}")
+            if records: rolls = statistics['rolls']
+            decision, dice_pass, payout, point = _play_round(roll, house, current_shooter, shooters, starting_bet, statistics,
+                                                             sinks, seat, rules, profiler)
+            if checkpoint and checkpoint.due(statistics['rounds']):
+                stays = dice_pass == DicePass.STAY
+                checkpoint.save(dict(seat=seat if stays else (seat + 1) % len(shooters), stay=stays, roll=roll, house=house,
+                                     shooters=shooters, starting_bet=starting_bet, rules=rules, statistics=statistics,
+                                     house_start=house_start))
+            if records:
+                yield RoundRecord(statistics['rounds'] - 1, seat, current_shooter.name, statistics['rolls'] - rolls,
+                                  point or 0, decision, dice_pass, payout, house.current_balance,
+                                  None if not balances else tuple(shooters.balance.tolist()) if seats else
+                                  tuple(s.current_balance for s in shooters))
+
+
+def resume(path: str, sinks=None, checkpoint: Checkpoint = None) -> dict:
+    """
+    Continue a game from the snapshot a Checkpoint wrote to `path`. The rest of the game is exactly what it would have
+    been without the interruption, roll for roll.
+
+    :param path: str, the snapshot, @see Checkpoint
+    :param sinks: the sinks for the rest of the game, @see game()
+    :param checkpoint: Checkpoint|None, keep snapshotting the resumed game, e.g. Checkpoint(path).
+    :return: the statistics of the whole game, @see game()
+    """
+    state = Checkpoint.load(path)
+    return game(roll=state['roll'], house=state['house'], shooters=state['shooters'], starting_bet=state['starting_bet'],
+                sinks=sinks, rules=state['rules'], checkpoint=checkpoint, state=state)
+
+
+@dataclass(frozen=True)
+class Table:
+    """
+    The configuration of a table: what the house and each shooter start with, the starting bet and the FixedRoll limit.
+    A Table is hashable and cheap to pickle, so it can be shipped to other processes which `play()` it there.
+    """
+
+    house: int = 10_000  ## the house's starting balance in USD
+    shooters: tuple = (1_000, 1_000, 1_000, 1_000)  ## each shooter's starting balance in USD, in shooting order
+    starting_bet: int = 100  ## what every bettor bets each round
+    max_rolls: int = 100  ## @see FixedRoll
+    rules: RuleSet = None  ## the bets, `None` for the pass line, @see RuleSet
+
+    def setup(self, rng=None) -> (Roll, Bettor, List[Shooter]):
+        """
+        Set up a fresh game at this table.
+        :param rng: the random stream for the dice, `None` for the module generator. @see spawn()
+        :return: (roll, house, shooters) ready for game()
+        """
+        roll = FixedRoll(max_rolls=self.max_rolls, rng=rng)
+        house = Bettor(name='house', balance=self.house)
+        shooters = [Shooter(name=f'shooter{i}', balance=b) for i, b in enumerate(self.shooters)]
+        return roll, house, shooters
+
+    def play(self, rng=None, sinks=None, checkpoint: Checkpoint = None, profiler: Profiler = None) -> dict:
+        """
+        Play one game at this table with fresh bettors, dice drawn from `rng`.
+        :param rng: the random stream for the dice, `None` for the module generator. @see spawn()
+        :param sinks: @see game()
+        :param checkpoint: @see game()
+        :param profiler: @see game()
+        :return: the game's statistics, @see game()
+        """
+        roll, house, shooters = self.setup(rng)
+        return game(roll=roll, house=house, shooters=shooters, starting_bet=self.starting_bet, sinks=sinks, rules=self.rules,
+                    checkpoint=checkpoint, profiler=profiler)
+
+    def rounds(self, rng=None, sinks=None):
+        """Like play(), a round at a time. @see game_rounds()"""
+        roll, house, shooters = self.setup(rng)
+        return game_rounds(roll=roll, house=house, shooters=shooters, starting_bet=self.starting_bet, sinks=sinks,
+                           rules=self.rules)
 
 
 def craps(level='INFO'):
     """
     Generate a game of craps and then play it.
     :param level: str, the logging level for the trace of the game.
-    :return:
+    :return: str, a line saying how the game ended. fire would list a Statistics' attributes and keys instead.
     """
     # Little hacky here.
     # Set the global logging level to the command line argument, e.g. --level=WARN
@@ -1031,9 +2342,8 @@ def craps(level='INFO'):
     global logger
     logger.setLevel(logging.getLevelName(level))
 
-    # Create a child logger based on the function name and set that level also.
-    me = inspect.stack()[0][3]  # name of this function
-    logger = logging.getLogger(me)
+    # Create a child logger named after this function and set that level also.
+    logger = logging.getLogger('craps')
     logger.setLevel(logging.getLevelName(level))
 
     # Play craps with a pair of six sided dice, explicit and external rules, a house starting with $10,000 USD and four players each starting with $1000 USD.
@@ -1046,9 +2356,36 @@ def craps(level='INFO'):
     # Running the game will eventually return some statistics about the game which a caller might use
     game_statistics = game(roll=FixedRoll(),
                            house=the_house,
-                           shooters=the_shooters)
-    return game_statistics
+                           shooters=the_shooters,
+                           sinks=[TextSink(logger)])
+    ending = ('nobody could bet anymore' if game_statistics['stalled'] else
+              'the house busted' if game_statistics['house_busted'] else 'the shooters busted')
+    return (f"{ending} after {game_statistics['rounds']} rounds and {game_statistics['rolls']} rolls, "
+            f"the house netted {game_statistics['house_net']}")
+
+
+def simulate(games: int = 1_000, house: int = 10_000, shooters=(1_000, 1_000, 1_000, 1_000), starting_bet: int = 100,
+             seed: int = None, workers: int = None, out: str = 'games.csv', chunk_size: int = 1_000) -> dict:
+    """
+    Play many games silently across worker processes and write one row per game to `out`, @see pycraps_sim.write_games()
+    :param games: int, how many games.
+    :param house: int, the house's starting balance in USD.
+    :param shooters: list of int, each shooter's starting balance in USD.
+    :param starting_bet: int, what every bettor bets.
+    :param seed: int, the seed for the games, `None` picks one. It's in the result.
+    :param workers: int, the worker processes, `None` for one per cpu.
+    :param out: str, the .csv or .npz file for the rows.
+    :param chunk_size: int, games per task and per write.
+    :return: str, a line saying where the rows went and how fast. fire would list a dict's keys instead.
+    """
+    from interview.pycraps_sim import write_games  ## pycraps_sim imports this module
+    table = Table(house=house, shooters=tuple(shooters), starting_bet=starting_bet)
+    result = write_games(out, games, table, seed=seed, workers=workers, chunk_size=chunk_size)
+    return (f"wrote {result['games']} games to {result['path']} in {result['seconds']:.1f}s "
+            f"({result['games_per_sec']:.0f} games/s), seed {result['seed']}")
 
 
 if '__main__' == __name__:
-    fire.Fire(craps())
+    # The command line runs the imported interview.pycraps, not this __main__ copy, @see pycraps_cli
+    from interview.pycraps_cli import main
+    main()  ## e.g. python -m interview.pycraps simulate --games=10000 --out=games.npz
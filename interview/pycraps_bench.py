@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for [pycraps](./pycraps.py).
+
+`run()` measures the hot paths and reports one number per metric as JSON:
+
+* `dice_roll_per_sec`, `dice_batch_per_sec`, `roll_per_sec`, `roll_batch_per_sec`: rolls per second for `Dice.roll()`,
+  `Dice.roll_batch()`, the buffered `Roll.roll()` and `Roll.roll_batch()`.
+* `win_per_sec`, `win_many_per_sec`: decisions per second for `win()` and `win_many()`.
+* `game_<level>_rounds_per_sec`, `game_<level>_games_per_sec`: `game()` throughput without sinks (`none`) and traced by a
+  `TextSink` whose logger is at `warning`, `info` or `debug`. The trace goes to a NullHandler, it's formatted but not written.
+* `settle_list_rounds_per_sec`, `settle_table_rounds_per_sec`: `play_round()` throughput with a thousand bettors, as a
+  list of `Shooter`s and as a `BettorTable`.
+* `lanes_rounds_per_sec`, `lanes_games_per_sec`: throughput of the lockstep engine in `pycraps_lanes`, ten thousand games
+  at once.
+* `peak_bytes_per_million_rolls`: the peak memory traced while a shooter shoots a million rolls.
+* `sinks_overhead`: @see bench_sinks()
+
+`compare()` checks a run against a stored baseline run and flags every metric that got worse by more than a tolerance.
+Rates are better when higher, everything else is better when lower. Runs are seeded, so two runs do the same work.
+
+    python -m interview.pycraps_bench run --out=bench.json
+    python -m interview.pycraps_bench compare bench.json baseline.json --tolerance=0.1
+
+`bench_sinks()` checks what a disabled sink costs. It plays the same seeded games twice with `game()`, once with its
+sinks and profiler off (`sinks=()`) and once traced by a `TextSink` whose logger is at `warning`. The overhead should
+stay within a few percent.
+
+    python -m interview.pycraps_bench bench_sinks --games=500
+"""
+
+import json
+import logging
+import platform
+import time
+import tracemalloc
+import numpy as np
+
+from interview.pycraps import (Bettor, BettorTable, Dice, Roll, Shooter, Statistics, Table, TextSink, game, play_round,
+                               spawn, win, win_many)
+from interview.pycraps_lanes import Lanes
+
+
+def _seconds(sinks, table: Table, games: int, seed: int) -> float:
+    """Wall time for `game()` to play `games` seeded games at `table` with `sinks`. The setup isn't timed."""
+    setups = [table.setup(rng) for rng in spawn(seed, games)]
+    start = time.perf_counter()
+    for roll, house, shooters in setups:
+        game(roll=roll, house=house, shooters=shooters, starting_bet=table.starting_bet, sinks=sinks)
+    return time.perf_counter() - start
+
+
+def bench_sinks(games: int = 200, seed: int = 0, repeat: int = 5, table: Table = Table()) -> dict:
+    """
+    Time `game()` with a disabled sink against `game()` with no sinks at all on the same games, best of `repeat`.
+    :return: dict of `no_sinks` and `disabled` seconds and the relative `overhead` of the disabled sink, e.g. 0.02 for 2%.
+    """
+    no_sinks, disabled = [], []
+    sinks = [TextSink(_null_logger('warning'))]
+    for i in range(repeat):  ## interleaved, so both see the same machine
+        no_sinks.append(_seconds((), table, games, seed))
+        disabled.append(_seconds(sinks, table, games, seed))
+    no_sinks, disabled = min(no_sinks), min(disabled)
+    return dict(games=games, no_sinks=no_sinks, disabled=disabled, overhead=disabled / no_sinks - 1)
+
+
+def _rate(work, count: int, repeat: int) -> float:
+    """`count` per second of the fastest of `repeat` calls to `work()`."""
+    best = float('inf')
+    for i in range(repeat):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def bench_dice(n: int = 200_000, repeat: int = 3) -> dict:
+    """Rolls per second for single and batched rolls of a Dice and a pair of dice (Roll)."""
+    dice, roller = Dice(rng=0), Roll(rng=0)
+
+    def dice_roll():
+        roll = dice.roll
+        for i in range(n): roll()
+
+    def roll_roll():
+        roll = roller.roll
+        for i in range(n): roll()
+
+    return dict(dice_roll_per_sec=_rate(dice_roll, n, repeat),
+                dice_batch_per_sec=_rate(lambda: dice.roll_batch(n), n, repeat),
+                roll_per_sec=_rate(roll_roll, n, repeat),
+                roll_batch_per_sec=_rate(lambda: roller.roll_batch(n), n, repeat))
+
+
+def bench_win(n: int = 200_000, repeat: int = 3) -> dict:
+    """Decisions per second for win() and win_many() on the same random totals and points."""
+    rng = np.random.default_rng(0)
+    totals = rng.integers(1, 7, n) + rng.integers(1, 7, n)
+    points = rng.choice([0, 4, 5, 6, 8, 9, 10], n)
+    pairs = list(zip(totals.tolist(), [point or None for point in points.tolist()]))
+
+    def decide():
+        for total, point in pairs: win(total, point)
+
+    return dict(win_per_sec=_rate(decide, n, repeat),
+                win_many_per_sec=_rate(lambda: win_many(totals, points), n, repeat))
+
+
+def _null_logger(level: str) -> logging.Logger:
+    """A logger at `level` that formats its records and throws them away."""
+    logger = logging.getLogger(f'{__name__}.{level}')
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    if not logger.handlers: logger.addHandler(logging.NullHandler())
+    return logger
+
+
+def bench_game(games: int = 50, seed: int = 0, repeat: int = 3, table: Table = Table()) -> dict:
+    """Rounds and games per second for game() without sinks and with a TextSink at each logging level."""
+    result = dict()
+    for level in ('none', 'warning', 'info', 'debug'):
+        sinks = None if level == 'none' else [TextSink(_null_logger(level))]
+        best, rounds = float('inf'), 0
+        for i in range(repeat):
+            setups = [table.setup(rng) for rng in spawn(seed, games)]
+            start = time.perf_counter()
+            rounds = sum(game(roll=roll, house=house, shooters=shooters, starting_bet=table.starting_bet, sinks=sinks)['rounds']
+                         for roll, house, shooters in setups)
+            best = min(best, time.perf_counter() - start)
+        result[f'game_{level}_rounds_per_sec'] = rounds / best
+        result[f'game_{level}_games_per_sec'] = games / best
+    return result
+
+
+def bench_settle(bettors: int = 1_000, rounds: int = 200, repeat: int = 3) -> dict:
+    """Rounds per second for play_round() at a table of `bettors` Shooters and at a BettorTable of as many seats."""
+    def rate(make):
+        best = float('inf')
+        for i in range(repeat):
+            roll, house, shooters = Roll(rng=0), Bettor('house', 10 ** 12), make()
+            statistics = Statistics()
+            start = time.perf_counter()
+            for r in range(rounds): play_round(roll, house, shooters[0], shooters, 1, statistics)
+            best = min(best, time.perf_counter() - start)
+        return rounds / best
+
+    return dict(settle_list_rounds_per_sec=rate(lambda: [Shooter(f'shooter{i}', 10 ** 9) for i in range(bettors)]),
+                settle_table_rounds_per_sec=rate(lambda: BettorTable.of(bettors, 10 ** 9)))
+
+
+def bench_lanes(games: int = 10_000, seed: int = 0, repeat: int = 3, table: Table = Table()) -> dict:
+    """Rounds and games per second for the lockstep engine in pycraps_lanes, compare game_none_* from bench_game()."""
+    best, rounds = float('inf'), 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        rounds = Lanes(games, table, rng=seed).run().statistics()['rounds']
+        best = min(best, time.perf_counter() - start)
+    return dict(lanes_rounds_per_sec=rounds / best, lanes_games_per_sec=games / best)
+
+
+def bench_memory(rolls: int = 1_000_000) -> dict:
+    """The peak memory traced while a shooter shoots `rolls` rolls, scaled to a million rolls."""
+    roller, shooter = Roll(rng=0), Shooter(name='Mike', balance=1_000)
+    tracemalloc.start()
+    try:
+        shoot = shooter.shoot
+        for i in range(rolls): shoot(roller)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return dict(peak_bytes_per_million_rolls=peak * 1_000_000 / rolls)
+
+
+def run(out: str = None, quick: bool = False) -> dict:
+    """
+    Run every benchmark.
+    :param out: str|None, write the results as JSON to this path.
+    :param quick: bool, do a tenth of the work, for smoke tests. Quick runs don't compare well with full runs.
+    :return: dict with `meta`, describing the machine, and `metrics`, {name: number}.
+    """
+    scale = 10 if quick else 1
+    metrics = dict()
+    metrics.update(bench_dice(n=200_000 // scale))
+    metrics.update(bench_win(n=200_000 // scale))
+    metrics.update(bench_game(games=50 // scale))
+    metrics.update(bench_settle(rounds=200 // scale))
+    metrics.update(bench_lanes(games=10_000 // scale))
+    metrics.update(bench_memory(rolls=1_000_000 // scale))
+    metrics['sinks_overhead'] = bench_sinks(games=200 // scale)['overhead']
+    result = dict(meta=dict(python=platform.python_version(), numpy=np.__version__, machine=platform.machine(),
+                            processor=platform.processor(), quick=quick, time=time.strftime('%Y-%m-%dT%H:%M:%S')),
+                  metrics=metrics)
+    if out:
+        with open(out, 'w') as f: json.dump(result, f, indent=2)
+    return result
+
+
+def _load(results) -> dict:
+    """Results as returned by run(), or the path to their JSON."""
+    if isinstance(results, str):
+        with open(results) as f: return json.load(f)
+    return results
+
+
+def compare(current, baseline, tolerance: float = 0.1) -> dict:
+    """
+    Compare a run against a baseline run, metric by metric.
+    :param current: dict|str, the results of run() or the path to their JSON.
+    :param baseline: dict|str, likewise for the baseline.
+    :param tolerance: float, how much worse a metric may get before it's a regression, 0.1 is 10%.
+    :return: dict with `metrics`, {name: dict(baseline, current, change, regression)} for the metrics in both runs,
+             where change is relative and positive when the metric got better, and `regressions`, the names of the
+             regressed metrics.
+    """
+    current, baseline = _load(current)['metrics'], _load(baseline)['metrics']
+    metrics = dict()
+    for name in sorted(current.keys() & baseline.keys()):
+        now, then = current[name], baseline[name]
+        higher_is_better = name.endswith('_per_sec')
+        if name == 'sinks_overhead':  ## already relative, compare the difference
+            change = then - now
+        else:
+            change = (now - then) / abs(then) if then else 0.0
+            if not higher_is_better: change = -change
+        metrics[name] = dict(baseline=then, current=now, change=change, regression=change < -tolerance)
+    return dict(metrics=metrics, regressions=[name for name, m in metrics.items() if m['regression']])
+
+
+if '__main__' == __name__:
+    import fire
+    fire.Fire()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+"""
+An on-disk cache of [pycraps](./pycraps.py) simulation results, so an identical run comes back in milliseconds.
+
+A result is stored under a content address: the SHA-256 of everything it depends on, in a canonical form. That's the
+table configuration with its RuleSet, the rule function (`win()` unless the rules name another), the seed and the
+number of games, and the code version, a hash of the modules that play the games. Edit `win()` or any of those
+modules and the old results are simply never found again. A seedless run is never cached, it can't be repeated.
+
+Entries are pickles in `directory`, `$XDG_CACHE_HOME/pycraps` by default. They're written to a temporary file that
+replaces the entry in one step, like a Checkpoint, so concurrent notebooks or CI jobs sharing a directory never read
+half an entry. Every hit touches its entry. Once the entries take more than `max_bytes`, the least recently used ones
+are deleted.
+
+`pycraps_sim.simulate()` and `pycraps_sweep.sweep()` take a `cache`. Leave it `None` to bypass the cache, pass
+`refresh=True` to play the games again and overwrite what's stored.
+
+Example:
+    from interview.pycraps import Table
+    from interview.pycraps_cache import ResultCache
+    from interview.pycraps_sweep import sweep
+    rows = sweep(games=10_000, house=range(2_000, 20_001, 2_000), seed=42, cache=ResultCache())  ## slow
+    rows = sweep(games=10_000, house=range(2_000, 20_001, 2_000), seed=42, cache=ResultCache())  ## milliseconds
+"""
+
+import dataclasses
+import enum
+import hashlib
+import json
+import os
+import pickle
+import types
+
+from interview.pycraps import Table, win
+
+SOURCES = ('pycraps.py', 'pycraps_sim.py', 'pycraps_sweep.py')  ## the modules whose code decides the results
+_code_version = None
+
+
+def code_version() -> str:
+    """A hash of the SOURCES, computed once per process."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for name in SOURCES:
+            with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), 'rb') as f: digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def _code_digest(code: types.CodeType) -> str:
+    """The bytecode, names and constants of `code` and the code nested in it. No addresses, no line numbers."""
+    digest = hashlib.sha256(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        digest.update((_code_digest(const) if isinstance(const, types.CodeType) else repr(const)).encode())
+    return digest.hexdigest()
+
+
+def canonical(value):
+    """`value` as plain JSON data that's the same in every process: dataclasses by field, functions by their code."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {'class': type(value).__qualname__,
+                **{f.name: canonical(getattr(value, f.name)) for f in dataclasses.fields(value) if f.compare}}
+    if isinstance(value, enum.Enum): return f'{type(value).__qualname__}.{value.name}'
+    if isinstance(value, types.FunctionType):
+        return {'function': f'{value.__module__}.{value.__qualname__}', 'code': _code_digest(value.__code__)}
+    if isinstance(value, dict): return [[canonical(k), canonical(v)] for k, v in sorted(value.items(), key=repr)]
+    if isinstance(value, (list, tuple)): return [canonical(v) for v in value]
+    if value is None or isinstance(value, (bool, int, float, str)): return value
+    if hasattr(value, 'item'): return value.item()  ## numpy scalars
+    raise TypeError(f"can't key a cache entry on {type(value).__name__} {value!r}")
+
+
+def key(kind: str, table: Table, seed: int, games: int, **extra) -> str:
+    """The content address of `kind` results of `games` games at `table` seeded with `seed`, @see the module docstring."""
+    rule = table.rules.rule if table.rules is not None else win
+    parts = dict(kind=kind, table=table, rule=rule, seed=seed, games=games, version=code_version(), **extra)
+    return hashlib.sha256(json.dumps(canonical(parts), sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """Results on disk under their keys, @see key(), the least recently used evicted beyond `max_bytes`."""
+
+    def __init__(self, directory: str = None, max_bytes: int = 256 << 20):
+        """
+        :param directory: str|None, where the entries go, created if needed. `None` for $XDG_CACHE_HOME/pycraps.
+        :param max_bytes: int, the most the entries may take on disk together.
+        """
+        if max_bytes <= 0: raise ValueError(f'need a positive size, got {max_bytes}')
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        self.directory = directory or os.path.join(cache_home, 'pycraps')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.pickle')
+
+    def get(self, key: str, default=None):
+        """The result stored under `key`, `default` if there's none. A hit makes the entry the most recently used."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f: value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  ## evicted by another process just now, the value is still good
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        """Store `value` under `key` atomically, then evict the least recently used entries beyond `max_bytes`."""
+        temporary = f'{self._path(key)}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self._path(key))
+        self.evict()
+
+    def fetch(self, key: str, compute, refresh: bool = False):
+        """The result under `key`, or `compute()`'s result stored there. `refresh` recomputes and overwrites it."""
+        value = None if refresh else self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def entries(self) -> list:
+        """(last used, bytes, path) of every entry, least recently used first."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pickle'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        """The bytes the entries take."""
+        return sum(size for used, size, path in self.entries())
+
+    def evict(self):
+        """Delete the least recently used entries until the rest fit in `max_bytes`."""
+        entries = self.entries()
+        total = sum(size for used, size, path in entries)
+        for used, size, path in entries:
+            if total <= self.max_bytes: break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Delete every entry."""
+        for used, size, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
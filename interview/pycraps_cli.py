@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+"""
+The command line of [pycraps](./pycraps.py): `craps` plays a traced game and is the default, `simulate` writes a row
+per game.
+
+`python -m interview.pycraps` runs `main()` from here. The commands are the functions of the imported
+`interview.pycraps`, not of the `__main__` copy of it that `-m` runs. So the tables and statistics `simulate` ships to
+and from its worker processes pickle under `interview.pycraps` and work with any start method, `spawn` (macOS,
+Windows) as well as `fork`.
+
+Only the command line configures logging and loads fire. Importing `interview.pycraps`, e.g. in every worker process
+of a pool, does neither. @see tests/test_pycraps.py test_import_is_quiet
+
+    python -m interview.pycraps --level=WARNING
+    python -m interview.pycraps simulate --games=10000 --out=games.npz
+"""
+
+import logging
+import sys
+
+import fire  ## https://github.com/google/python-fire/blob/master/docs/guide.md
+
+from interview.pycraps import craps, logger, simulate
+
+
+def main(argv=None):
+    """
+    Run the command in `argv`, `craps` if there's none.
+    :param argv: list of str, the command and its flags, `None` for the command line.
+    :return: what the command returned, fire prints it.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0].startswith('-'): argv.insert(0, 'craps')  ## craps is the default command
+    logging.basicConfig(level=logging.DEBUG)
+    logger.debug(f"logging starts at level {logging.getLevelName(logger.getEffectiveLevel())}")
+    return fire.Fire(dict(craps=craps, simulate=simulate), command=argv)
+
+
+if '__main__' == __name__:
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""
+A casino floor for [pycraps](./pycraps.py): many craps tables played as asyncio tasks against one shared house.
+
+Each table is a task that plays one round at a time with `play_round()` and yields to the event loop between rounds,
+so a single process can run tens of thousands of tables. A round never awaits anything, so settling its bets against
+the shared house `Bettor` is atomic: no other table can see or change the house's balance halfway through a round.
+For the same reason players can `move()` between tables at any time, the move lands between two rounds of both tables.
+
+The floor closes when the house is busted, checked before every round of every table. A table closes when none of its
+players can cover the starting bet, or after `rounds` rounds. Players can't move to a closed table. A table that closes
+with money left at it but nobody able to bet is stalled, like a stalled game(), and counts `stalled` in its statistics.
+
+Example:
+    floor = Floor(Bettor(name='house', balance=1_000_000))
+    for t in range(10_000):
+        floor.add_table([Shooter(name=f'{t}.{i}', balance=1_000) for i in range(4)], rng=t)
+    asyncio.run(floor.run(rounds=100))
+    print(floor.counters()['rounds_per_sec'])
+"""
+
+import asyncio
+import time
+from typing import List
+
+from interview.pycraps import Bettor, DicePass, FixedRoll, Shooter, Statistics, play_round
+
+
+class FloorTable:
+    """A table on the floor: its players in shooting order, its dice and its throughput counters."""
+
+    def __init__(self, name: str, players: List[Shooter], roll: FixedRoll, starting_bet: int = 100):
+        self.name = name
+        self.players = list(players)
+        self.roll = roll
+        self.starting_bet = starting_bet
+        self.statistics = Statistics()  ## @see play_round()
+        self.closed = False
+
+    def live(self) -> bool:
+        """Can the table go on? Someone at it must cover the starting bet, @see game()"""
+        return any(p.current_balance >= self.starting_bet for p in self.players)
+
+    @property
+    def stalled(self) -> bool:
+        """Did the table close with money at it that nobody can bet? @see _play()"""
+        return self.statistics['stalled'] > 0
+
+
+class Floor:
+    """The tables, the shared house and the floor wide counters."""
+
+    def __init__(self, house: Bettor):
+        self.house = house
+        self.tables = []
+        self._seated = dict()  ## id(player) -> the FloorTable the player sits at
+        self._started = None  ## perf_counter() when run() started
+        self._seconds = 0.0  ## how long run() ran
+
+    def add_table(self, players: List[Shooter], rng=None, starting_bet: int = 100, name: str = None,
+                  block_size: int = 256) -> FloorTable:
+        """
+        Open a table for `players`.
+        :param rng: the table's random stream, @see pycraps.spawn()
+        :param block_size: rolls buffered per table, kept small because there are many tables, @see Roll
+        """
+        table = FloorTable(name or f'table{len(self.tables)}', players,
+                           FixedRoll(rng=rng, block_size=block_size), starting_bet)
+        self.tables.append(table)
+        for player in table.players: self._seated[id(player)] = table
+        return table
+
+    def table_of(self, player: Shooter) -> FloorTable:
+        """The table `player` sits at, None if none."""
+        return self._seated.get(id(player))
+
+    def move(self, player: Shooter, to: FloorTable):
+        """Move `player` to table `to`, at the end of its shooting order."""
+        if to.closed: raise ValueError(f'{to.name} is closed')
+        here = self.table_of(player)
+        if here: here.players = [p for p in here.players if p is not player]
+        to.players.append(player)
+        self._seated[id(player)] = to
+
+    async def _play(self, table: FloorTable, rounds: int = None):
+        """Play `table` until it or the floor closes, one round per turn of the event loop."""
+        shooter, dice_pass = None, DicePass.NEXT
+        while self.house.current_balance > 0 and table.live() and (rounds is None or table.statistics['rounds'] < rounds):
+            # Pass the dice when the shooter loses, left the table or is broke.
+            if dice_pass == DicePass.NEXT or not any(p is shooter for p in table.players) or shooter.current_balance <= 0:
+                shooter = self._next_shooter(table, shooter)
+            decision, dice_pass, payout = play_round(table.roll, self.house, shooter, table.players, table.starting_bet,
+                                                     table.statistics)
+            await asyncio.sleep(0)  ## let the other tables play a round
+        if self.house.current_balance > 0 and not table.live() and any(p.current_balance > 0 for p in table.players):
+            table.statistics['stalled'] = 1  ## nobody can bet anymore, the shooters would take turns forever
+        table.closed = True
+
+    @staticmethod
+    def _next_shooter(table: FloorTable, shooter: Shooter) -> Shooter:
+        """The next player after `shooter` with money to shoot, in the table's order. The first one if `shooter` left."""
+        players = table.players
+        seat = next((i for i, p in enumerate(players) if p is shooter), -1)
+        for i in range(1, len(players) + 1):
+            candidate = players[(seat + i) % len(players)]
+            if candidate.current_balance > 0: return candidate
+        raise ValueError(f'nobody at {table.name} can shoot')
+
+    async def run(self, rounds: int = None):
+        """Play every table as its own task until the floor closes, or each table played `rounds` rounds."""
+        self._started = time.perf_counter()
+        try:
+            await asyncio.gather(*(self._play(table, rounds) for table in self.tables))
+        finally:
+            self._seconds += time.perf_counter() - self._started
+            self._started = None
+
+    def counters(self) -> dict:
+        """
+        Throughput so far: `tables`, {name: dict(rounds, rolls, wagered, stalled)}, and the floor wide `rounds`,
+        `rolls`, `seconds`, `rounds_per_sec` and `rolls_per_sec`. Safe to call while the floor runs.
+        """
+        seconds = self._seconds + (time.perf_counter() - self._started if self._started else 0.0)
+        rounds = sum(t.statistics['rounds'] for t in self.tables)
+        rolls = sum(t.statistics['rolls'] for t in self.tables)
+        return dict(tables={t.name: dict(rounds=t.statistics['rounds'], rolls=t.statistics['rolls'],
+                                         wagered=t.statistics['wagered'], stalled=t.stalled) for t in self.tables},
+                    rounds=rounds,
+                    rolls=rolls,
+                    seconds=seconds,
+                    rounds_per_sec=rounds / seconds if seconds else 0.0,
+                    rolls_per_sec=rolls / seconds if seconds else 0.0)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+A lockstep engine for [pycraps](./pycraps.py): many independent games played together as numpy arrays.
+
+`game()` plays one table at a time, a Python loop per roll. `Lanes` plays N games at once, one game per lane. Every
+lane has its own point, current shooter (`seat`), house and shooter balances and counters, and `done` marks the lanes
+whose game is over. One `step()` rolls the dice once for every live lane, decides all of them with `win_many()`, which
+applies the rules of `win()`, and settles the decided rounds the way `game()` does: every shooter who can cover the
+starting bet bets it and wins `payout` times the bet or loses it. The game is checked for its end when the dice pass,
+just like `game()`, so the outcomes are distributed exactly like `game()`'s. A million games take seconds, not hours.
+
+The lanes don't replay `game()` roll for roll, they all draw from one random stream. One difference to `game()`:
+`FixedRoll`'s limit on the rolls in a round is ignored (a round with 100 rolls has a probability of about 1e-12). A
+game where nobody left can cover the starting bet is ended and counted as `stalled`, like `game()` does.
+
+Example:
+    from interview.pycraps import Table
+    from interview.pycraps_lanes import simulate
+    result = simulate(games=1_000_000, table=Table(house=5_000), seed=42)
+    print(result['house_edge'], result['house_bust_rate'])
+"""
+
+import numpy as np
+
+from interview.pycraps import DicePass, Roll, Round, Table, spawn, win_many
+
+
+class Lanes:
+    """N games at `table`, advanced together a roll at a time."""
+
+    def __init__(self, n: int, table: Table = Table(), rng=None, roll: Roll = None):
+        """
+        :param n: int, the number of games (lanes).
+        :param table: Table, the configuration every game starts from.
+        :param rng: the random stream for the dice, e.g. a seed. @see spawn()
+        :param roll: Roll, whose dice the lanes roll, `None` for a pair of six sided dice. Only its dice are used.
+        """
+        if n <= 0: raise ValueError(f'need at least one lane, got {n}')
+        if table.rules is not None: raise ValueError('lanes bet the pass line only, the table has rules')
+        self.table = table
+        self.rng = np.random.default_rng(rng)
+        self.faces = [np.asarray(dice.values) for dice in (roll or Roll()).dice]
+        self.house = np.full(n, table.house, dtype=np.int64)
+        self.balances = np.tile(np.asarray(table.shooters, dtype=np.int64), (n, 1))
+        self.point = np.zeros(n, dtype=np.int64)  ## 0 is "off"
+        self.seat = np.zeros(n, dtype=np.intp)  ## the current shooter's index
+        self.done = np.zeros(n, dtype=bool)
+        self.stalled = np.zeros(n, dtype=bool)
+        self.rounds, self.rolls, self.wagered = (np.zeros(n, dtype=np.int64) for i in range(3))
+        self._pass_dice(np.arange(n), offset=0)  ## game() checks before the first round too, starting with seat 0
+
+    def __len__(self):
+        return len(self.done)
+
+    def _pass_dice(self, lanes: np.ndarray, offset: int = 1):
+        """The checks game() makes when the dice pass: end the games in `lanes` or seat the next shooter with money."""
+        balances = self.balances[lanes]
+        over = (self.house[lanes] <= 0) | ~(balances > 0).any(axis=1)
+        stalled = ~over & ~(balances >= self.table.starting_bet).any(axis=1)
+        self.done[lanes[over | stalled]] = True
+        self.stalled[lanes[stalled]] = True
+        going = ~(over | stalled)
+        lanes, balances = lanes[going], balances[going]
+        seats = balances.shape[1]
+        candidates = (self.seat[lanes, None] + offset + np.arange(seats)) % seats  ## seats in shooting order
+        solvent = np.take_along_axis(balances, candidates, axis=1) > 0
+        self.seat[lanes] = candidates[np.arange(len(lanes)), solvent.argmax(axis=1)]  ## the first one with money
+
+    def step(self) -> int:
+        """
+        Roll once in every live lane, decide and settle the rounds, pass the dice where the rules say so.
+        :return: int, the number of lanes that rolled, 0 once every game is over.
+        """
+        live = np.flatnonzero(~self.done)
+        if not len(live): return 0
+        totals = sum(faces[self.rng.integers(len(faces), size=len(live))] for faces in self.faces)
+        decisions, passes, points, payouts = win_many(totals, self.point[live])
+        self.point[live] = points
+        self.rolls[live] += 1
+
+        decided = decisions != Round.DRAW.value
+        if decided.any():
+            lanes = live[decided]
+            bet = self.table.starting_bet
+            multipliers = np.where(decisions[decided] == Round.WIN.value, payouts[decided], -1).astype(np.int64)
+            stakes = np.where(self.balances[lanes] >= bet, bet, 0)  ## who can cover the starting bet bets it
+            bets = stakes.sum(axis=1)
+            self.balances[lanes] += stakes * multipliers[:, None]
+            self.house[lanes] -= bets * multipliers
+            self.wagered[lanes] += bets
+            self.rounds[lanes] += 1
+            passing = lanes[passes[decided] == DicePass.NEXT.value]
+            if len(passing): self._pass_dice(passing)
+        return len(live)
+
+    def run(self, max_steps: int = None) -> 'Lanes':
+        """Step until every game is over, or for at most `max_steps` steps. Returns self."""
+        steps = 0
+        while (max_steps is None or steps < max_steps) and self.step(): steps += 1
+        return self  ## fluent
+
+    def statistics(self) -> dict:
+        """The summed counts of the finished games, with the same names as game()'s statistics, plus `stalled`."""
+        done = self.done
+        house_busted = done & (self.house <= 0)
+        return dict(games=int(done.sum()),
+                    rounds=int(self.rounds[done].sum()),
+                    rolls=int(self.rolls[done].sum()),
+                    wagered=int(self.wagered[done].sum()),
+                    house_net=int((self.house[done] - self.table.house).sum()),
+                    house_busted=int(house_busted.sum()),
+                    shooters_busted=int((done & ~house_busted & ~self.stalled).sum()),
+                    stalled=int(self.stalled.sum()))
+
+
+def simulate(games: int, table: Table = Table(), seed: int = None, lanes: int = 100_000) -> dict:
+    """
+    Play `games` games at `table` in batches of at most `lanes` lanes and sum their statistics.
+
+    :param games: int, the number of games to play.
+    :param table: Table, the configuration every game starts from.
+    :param seed: int|None, the seed for the batches' random streams. `None` picks one, it's returned in the result.
+    :param lanes: int, the most games played together, caps the memory at a few dozen bytes per lane and shooter.
+    :return: dict, @see Lanes.statistics() plus `seed`, `house_edge` and `house_bust_rate` like pycraps_sim.simulate().
+    """
+    if games <= 0: raise ValueError(f'need at least one game, got {games}')
+    if lanes <= 0: raise ValueError(f'need a positive number of lanes, got {lanes}')
+    if seed is None: seed = np.random.SeedSequence().entropy
+    sizes = [min(lanes, games - start) for start in range(0, games, lanes)]
+    result = dict()
+    for size, rng in zip(sizes, spawn(seed, len(sizes))):
+        for k, v in Lanes(size, table, rng).run().statistics().items(): result[k] = result.get(k, 0) + v
+
+    result['seed'] = seed
+    result['house_edge'] = result['house_net'] / result['wagered'] if result['wagered'] else 0.0
+    result['house_bust_rate'] = result['house_busted'] / result['games']
+    return result
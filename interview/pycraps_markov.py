@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+"""
+Exact odds for [pycraps](./pycraps.py) by way of absorbing Markov chains.
+
+Simulating `game()` needs a lot of games to resolve small probabilities such as the house going bust. The game is small
+enough to solve exactly instead, in two steps:
+
+1. A round. The states are the points `win()` can set, starting with the point off. Every total of the dice moves the
+   round from one point to the next or decides it. Solving that chain gives the probability of each decision and
+   payout, and the expected number of rolls in a round. For two six sided dice and the rules in `win()`, the shooter
+   wins a round with probability 244/495.
+
+2. A game. The states are the shooters' balances, the house holds whatever money the shooters don't. Every round,
+   each shooter who can cover `starting_bet` bets it and wins or loses it together with the others, just like `game()`
+   settles a round. Who shoots doesn't change anyone's balance, so it isn't part of the state. When the dice pass, the
+   game is absorbed if the house is busted, all the shooters are busted, or nobody left can cover the starting bet.
+   `game()` ends that last case as "stalled" and so does the chain, it's reported on its own.
+
+Both chains are solved with sparse linear algebra: for transient states Q and absorbing states R, the expected number of
+steps until absorption t solves (I - Q) t = 1 and the absorption probabilities B solve (I - Q) B = R.
+
+`FixedRoll`'s limit on the rolls in a round is ignored, a round with 100 rolls has a probability of about 1e-12.
+
+Example:
+    from interview.pycraps import Table
+    from interview.pycraps_markov import solve
+    odds = solve(Table(house=2_000, shooters=(1_000,)))
+    print(odds['p_house_ruin'], odds['expected_rounds'])
+"""
+
+from collections import deque
+
+import numpy as np
+from scipy.sparse import csc_matrix, identity
+from scipy.sparse.linalg import spsolve
+
+from interview.pycraps import DicePass, Round, Roll, Table, win
+
+
+def total_distribution(roll: Roll = None) -> dict:
+    """The probability of every total of `roll`'s dice, {total: p}. @see Roll.distribution()"""
+    return (roll or Roll()).distribution()
+
+
+def _absorb(start, step) -> (list, dict, np.ndarray, np.ndarray):
+    """
+    Build and solve the absorbing chain reachable from state `start`.
+
+    :param start: the initial (transient) state, any hashable.
+    :param step: function(state) -> list of (probability, state, absorbed, extra steps). `absorbed` marks absorbing
+                 states, `extra steps` counts steps taken after the chain has been absorbed, usually 0.
+    :return: (transient states, {absorbing state: column}, expected steps until absorption per transient state,
+              absorption probabilities with a row per transient state and a column per absorbing state)
+    """
+    transient, absorbing = {start: 0}, dict()
+    q_rows, q_cols, q_data, r_rows, r_cols, r_data = [], [], [], [], [], []
+    costs = [1.0]  ## expected steps taken out of each transient state
+    todo = deque([start])
+    while todo:
+        state = todo.popleft()
+        row = transient[state]
+        for p, following, absorbed, extra in step(state):
+            costs[row] += p * extra
+            if absorbed:
+                r_rows.append(row)
+                r_cols.append(absorbing.setdefault(following, len(absorbing)))
+                r_data.append(p)
+            else:
+                if following not in transient:
+                    transient[following] = len(transient)
+                    costs.append(1.0)
+                    todo.append(following)
+                q_rows.append(row)
+                q_cols.append(transient[following])
+                q_data.append(p)
+
+    n = len(transient)
+    q = csc_matrix((q_data, (q_rows, q_cols)), shape=(n, n))  ## duplicate entries are summed
+    r = csc_matrix((r_data, (r_rows, r_cols)), shape=(n, len(absorbing)))
+    fundamental = (identity(n, format='csc') - q).tocsc()
+    steps = np.atleast_1d(spsolve(fundamental, np.array(costs)))
+    probabilities = spsolve(fundamental, r)
+    probabilities = probabilities.toarray() if hasattr(probabilities, 'toarray') else probabilities.reshape(n, -1)
+    return list(transient), absorbing, steps, probabilities
+
+
+def round_odds(roll: Roll = None, rule=win) -> dict:
+    """
+    Solve a single round.
+
+    :param roll: Roll, the dice of the round, `None` for a pair of six sided dice.
+    :param rule: the rules, @see win()
+    :return: dict with `outcomes`, {(Round, DicePass, BetPayout): probability} for every way a round is decided, and
+             `expected_rolls`, the expected number of rolls in a round.
+    """
+    distribution = total_distribution(roll)
+
+    def step(point):
+        following = []
+        for total, p in distribution.items():
+            decision, dice_pass, next_point, payout = rule(total, point)
+            if decision == Round.DRAW:
+                following.append((p, next_point, False, 0))
+            else:
+                following.append((p, (decision, dice_pass, payout), True, 0))
+        return following
+
+    points, outcomes, rolls, probabilities = _absorb(None, step)
+    return dict(outcomes={outcome: float(probabilities[0, column]) for outcome, column in outcomes.items()},
+                expected_rolls=float(rolls[0]))
+
+
+def solve(table: Table = Table(), roll: Roll = None, rule=win) -> dict:
+    """
+    Solve a whole game at `table`.
+
+    Like `game()`, the chain only checks whether the game is over when the dice pass to the next shooter. While the
+    shooter keeps winning, the house can go below zero and still recover when the shooter finally loses. Once the
+    house is so far below zero that the next lost round can't bring it back, the house is ruined for sure. The chain
+    stops there and adds the rounds left until the dice pass to the expected rounds, which keeps the chain finite.
+
+    :param table: Table, the starting balances and the starting bet.
+    :param roll: Roll, the dice of the game, `None` for a pair of six sided dice.
+    :param rule: the rules, @see win()
+    :return: dict of
+             * `p_win`, `p_lose`: the probabilities the shooter wins or loses a round.
+             * `expected_payout`: what a bettor expects back per dollar bet in a round, negative is the house edge.
+             * `expected_round_payout`: what the house expects to pay all bettors in the first round, in USD.
+             * `expected_rolls_per_round`: the expected number of rolls in a round.
+             * `expected_rounds`, `expected_rolls`: expected rounds and rolls until the game is over.
+             * `p_house_ruin`, `p_shooters_ruin`, `p_stalled`: how the game ends, @see the module docstring.
+             * `states`: the number of transient states in the game's chain.
+    """
+    if table.rules is not None: raise ValueError('only the pass line is modelled, the table has rules')
+    odds = round_odds(roll, rule)
+    bet = table.starting_bet
+    money = table.house + sum(table.shooters)  ## the money at the table never changes, it just moves
+
+    # A round settles like game() does: on a win every bettor wins payout * bet, otherwise every bettor loses the bet.
+    multipliers = [(p, int(payout) if decision == Round.WIN else -1, dice_pass == DicePass.NEXT)
+                   for (decision, dice_pass, payout), p in odds['outcomes'].items()]
+    if any(m < 0 and not passes for p, m, passes in multipliers):
+        raise ValueError('rules where bettors lose without passing the dice are not supported')
+    p_pass = sum(p for p, m, passes in multipliers if passes)
+    recovery = max([-m for p, m, passes in multipliers if passes] + [0])  ## the most a passing round wins the house
+    expected_payout = sum(p * m for p, m, passes in multipliers)
+
+    def over(balances):
+        """None while the game goes on, otherwise how it ended. Checked in the same order as game()."""
+        if money - sum(balances) <= 0: return 'house'
+        if not any(b > 0 for b in balances): return 'shooters'
+        if not any(b >= bet for b in balances): return 'stalled'
+        return None
+
+    def step(balances):
+        following = []
+        for p, m, passes in multipliers:
+            after = tuple(b + m * bet if b >= bet else b for b in balances)
+            if passes:
+                ended = over(after)
+                following.append((p, ended or after, ended is not None, 0))
+            elif money - sum(after) + recovery * bet * sum(1 for b in after if b >= bet) <= 0:
+                following.append((p, 'house', True, 1 / p_pass))  ## doomed, the rounds until the dice pass still count
+            else:
+                following.append((p, after, False, 0))
+        return following
+
+    start = tuple(table.shooters)
+    if over(start): raise ValueError(f'{table} is over before it starts')
+    states, ends, rounds, probabilities = _absorb(start, step)
+    ruin = {end: float(probabilities[0, ends[end]]) if end in ends else 0.0 for end in ('house', 'shooters', 'stalled')}
+
+    p_win = sum(p for (decision, dice_pass, payout), p in odds['outcomes'].items() if decision == Round.WIN)
+    bettors = sum(1 for b in start if b >= bet)
+    return dict(p_win=p_win,
+                p_lose=1.0 - p_win,
+                expected_payout=expected_payout,
+                expected_round_payout=expected_payout * bet * bettors,
+                expected_rolls_per_round=odds['expected_rolls'],
+                expected_rounds=float(rounds[0]),
+                expected_rolls=float(rounds[0]) * odds['expected_rolls'],
+                p_house_ruin=ruin['house'],
+                p_shooters_ruin=ruin['shooters'],
+                p_stalled=ruin['stalled'],
+                states=len(states))
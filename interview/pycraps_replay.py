@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Indexed replay of recorded [pycraps](./pycraps.py) games, with random access to any round.
+
+A recording, a `MappedSequenceGame` read from a `Recorder`'s file or a `SequenceGame`, holds the rolls and where each
+round ends, but not the balances. `Replay` plays the recorded rolls through `game_rounds()` at the `Table` the game
+was played at, which brings back everything else.
+
+Auditing round k of a ten million roll recording shouldn't replay all the rounds before it. `index()` replays the
+recording once and keeps where every round starts in the rolls and, every `every` rounds, a snapshot of the balances
+and of who holds the dice. `seek(k)` then starts from the last snapshot before round k and replays at most `every - 1`
+rounds to get there. The index can be saved next to the recording and loaded instead of rebuilt.
+
+Example:
+    from interview.pycraps import MappedSequenceGame, Table
+    from interview.pycraps_replay import Replay
+    replay = Replay(MappedSequenceGame('game.pycraps'), Table(house=10_000)).index()
+    print(replay.round(1_234_567))
+"""
+
+from itertools import islice
+
+import numpy as np
+
+from interview.pycraps import Bettor, DicePass, ReplayRoll, Shooter, Statistics, Table, game_rounds
+
+
+class Replay:
+    """The rounds of a recording played at `table`, @see the module docstring."""
+
+    def __init__(self, recording, table: Table = Table(), every: int = 1_000):
+        """
+        :param recording: MappedSequenceGame|SequenceGame, the recorded game.
+        :param table: Table, where the game was played: the starting balances, the starting bet and the rules.
+        :param every: int, the rounds between two snapshots of the index, the most rounds a seek replays.
+        """
+        if every <= 0: raise ValueError(f'need a positive number of rounds between snapshots, got {every}')
+        self.table = table
+        self.every = every
+        if hasattr(recording, 'records'):  ## a MappedSequenceGame, the rounds end where a roll has a payout
+            self.faces = recording.records['faces']
+            ends = np.flatnonzero(recording.records['payout'] != 0) + 1
+            self.seats = recording.records['seat']
+        else:
+            rounds = [r['rolls'] for r in recording.seq]
+            self.faces = np.array([roll for rolls in rounds for roll in rolls])
+            ends = np.cumsum([len(rolls) for rolls in rounds])
+            self.seats = None  ## a SequenceGame names its shooters, it doesn't seat them
+        self.starts = np.concatenate([[0], ends])[:len(ends)].astype(np.int64)  ## the first roll of every decided round
+        self.snapshots = None  ## @see index()
+
+    def __len__(self):
+        """The decided rounds in the recording."""
+        return len(self.starts)
+
+    def _rounds(self, house: int, balances, seat: int, stay: bool, round: int):
+        """game_rounds() continuing the recording at `round` with these balances and the dice at `seat`."""
+        statistics = Statistics()
+        statistics['games'], statistics['rounds'], statistics['rolls'] = 1, round, int(self.starts[round])
+        shooters = [Shooter(name=f'shooter{i}', balance=int(b)) for i, b in enumerate(balances)]
+        state = dict(statistics=statistics, house_start=self.table.house, seat=int(seat), stay=bool(stay))
+        return game_rounds(roll=ReplayRoll(self.faces).seek(int(self.starts[round])),
+                           house=Bettor(name='house', balance=int(house)), shooters=shooters,
+                           starting_bet=self.table.starting_bet, rules=self.table.rules, state=state)
+
+    def play(self):
+        """The recording's decided rounds from the first, a RoundRecord each, @see game_rounds()"""
+        return islice(self._rounds(self.table.house, self.table.shooters, 0, False, 0), len(self))
+
+    def index(self) -> 'Replay':
+        """
+        Replay the whole recording once and snapshot it every `every` rounds. Checks that the replay seats the shooters
+        the recording seated, a recording made at another table doesn't replay. Returns self.
+        """
+        rounds = len(self)
+        count = max(1, (rounds + self.every - 1) // self.every)
+        house, balances = np.empty(count, dtype=np.int64), np.empty((count, len(self.table.shooters)), dtype=np.int64)
+        seat, stay = np.zeros(count, dtype=np.int64), np.zeros(count, dtype=bool)
+        house[0], balances[0] = self.table.house, self.table.shooters
+        for record in self.play():
+            if self.seats is not None and record.seat != self.seats[self.starts[record.round]]:
+                raise ValueError(f'round {record.round} was shot from seat {self.seats[self.starts[record.round]]}, '
+                                 f'the replay at {self.table} shoots from seat {record.seat}')
+            following = record.round + 1
+            if following % self.every == 0 and following < rounds:
+                i = following // self.every
+                house[i], balances[i] = record.house, record.balances
+                stays = record.dice_pass == DicePass.STAY
+                seat[i], stay[i] = record.seat if stays else (record.seat + 1) % len(balances[i]), stays
+        self.snapshots = dict(house=house, balances=balances, seat=seat, stay=stay)
+        return self
+
+    def seek(self, k: int):
+        """The decided rounds from round `k` on, a RoundRecord each. Builds the index if needed."""
+        if not 0 <= k < len(self): raise ValueError(f'no round {k} in {len(self)} rounds')
+        if self.snapshots is None: self.index()
+        i = k // self.every
+        snapshot = {name: values[i] for name, values in self.snapshots.items()}
+        rounds = self._rounds(round=i * self.every, **snapshot)
+        for record in islice(rounds, k - i * self.every): pass  ## replay the rounds since the snapshot
+        return islice(rounds, len(self) - k)  ## a recording cut short ends with an unfinished round
+
+    def round(self, k: int):
+        """The RoundRecord of round `k`."""
+        return next(self.seek(k))
+
+    def save_index(self, path: str):
+        """Save the index to the .npz file `path`."""
+        if self.snapshots is None: self.index()
+        np.savez(path, every=self.every, starts=self.starts, **self.snapshots)
+
+    def load_index(self, path: str) -> 'Replay':
+        """Load an index saved by save_index() for this recording and table. Returns self."""
+        with np.load(path) as saved:
+            if not np.array_equal(saved['starts'], self.starts): raise ValueError(f'{path} indexes another recording')
+            self.every = int(saved['every'])
+            self.snapshots = {name: saved[name] for name in ('house', 'balances', 'seat', 'stay')}
+        return self
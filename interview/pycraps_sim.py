@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+Monte Carlo driver for [pycraps](./pycraps.py).
+
+Estimating the house edge or how often the house busts means playing `game()` many, many times. `simulate()` splits
+the games into chunks of `chunk_size` games and plays the chunks on a `ProcessPoolExecutor`. Each worker returns the
+merged `Statistics` of its chunk, which keeps the traffic between processes to one small dict per chunk however many
+games or rolls it played. Pick a `chunk_size` big enough that a chunk takes much longer to play than to ship.
+
+Every game gets its own random stream, `pycraps.spawn()`'s child of the seed at the game's index. The streams are
+independent and depend only on the seed and the game's index, not on the chunk or the process that plays the game.
+So a given seed produces the same result no matter how many workers run. (The counts are exact for any `chunk_size`,
+the running means and variances merge in floating point and can differ in the last bits across chunk sizes.)
+
+`simulate_until()` doesn't need the number of games up front. It plays batches of games until the confidence interval
+of one metric, `house_edge`, `house_bust_rate` or `mean_rounds`, is as narrow as asked for. After each batch it
+extrapolates from the interval's width how many more games it takes and plays about that many, so it stops close to
+the number of games the precision needs.
+
+Given a `cache`, a seeded `simulate()` is played once and then read back from disk, @see pycraps_cache.
+
+Example:
+    from interview.pycraps import Statistics, Table, spawn
+    from interview.pycraps_sim import simulate
+    result = simulate(games=100_000, table=Table(house=5_000), seed=42)
+    print(result['house_edge'], result['house_bust_rate'])
+    result = simulate_until('house_bust_rate', half_width=0.005, table=Table(house=5_000), seed=42)
+    print(result['estimate'], result['low'], result['high'], result['games'])
+
+`write_games()` keeps every game instead: one row per game with its rounds, rolls, final balances and how it ended,
+written to CSV or `.npz` a chunk at a time. From the command line:
+
+    python -m interview.pycraps simulate --games=100000 --house=5000 --shooters='[1000,1000]' --seed=42 --out=games.csv
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import norm
+
+import interview.pycraps as pycraps
+from interview.pycraps import Statistics, Table, spawn
+from interview.pycraps_cache import ResultCache, key
+
+
+def _play_chunk(table: Table, seed: int, start: int, stop: int) -> Statistics:
+    """Play games `start` up to `stop` at `table`, return their merged statistics."""
+    result = Statistics()
+    for rng in spawn(seed, stop - start, start):
+        result.merge(table.play(rng=rng))
+    return result
+
+
+def simulate(games: int, table: Table = Table(), seed: int = None, workers: int = None, chunk_size: int = 1000,
+             cache: ResultCache = None, refresh: bool = False) -> dict:
+    """
+    Play `games` games at `table` across a pool of worker processes and aggregate their statistics.
+
+    :param games: int, the number of games to play.
+    :param table: Table, the configuration every game starts from.
+    :param seed: int|None, the seed for the games' random streams. `None` picks one, it's returned in the result.
+    :param workers: int|None, the number of worker processes, `None` for one per cpu.
+    :param chunk_size: int, the number of games a worker plays per task.
+    :param cache: ResultCache|None, return the stored result of an identical seeded run, or store this one. `None`
+                  bypasses the cache. @see pycraps_cache
+    :param refresh: bool, play the games even if they're cached and overwrite the entry.
+    :return: Statistics, the merged statistics of all the games plus `seed`, `house_edge` and `house_bust_rate`.
+    """
+    if games <= 0: raise ValueError(f'need at least one game, got {games}')
+    if chunk_size <= 0: raise ValueError(f'need a positive chunk_size, got {chunk_size}')
+    if cache is not None and seed is not None:  ## the chunks decide the last bits of the running means, @see above
+        return cache.fetch(key('simulate', table, seed, games, chunk_size=chunk_size),
+                           lambda: simulate(games, table, seed, workers, chunk_size), refresh)
+    if seed is None: seed = np.random.SeedSequence().entropy  ## fix the seed now so that every chunk agrees on it
+
+    starts = range(0, games, chunk_size)
+    stops = [min(start + chunk_size, games) for start in starts]
+    result = Statistics()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        # map() hands back the chunks in order, so the merge is the same however the chunks were scheduled.
+        for chunk in pool.map(_play_chunk, [table] * len(starts), [seed] * len(starts), starts, stops):
+            result.merge(chunk)
+
+    result['seed'] = seed
+    result['house_edge'] = result['house_net'] / result['wagered'] if result['wagered'] else 0.0
+    result['house_bust_rate'] = result['house_busted'] / result['games']
+    return result
+
+
+SAMPLE_COLUMNS = ('house_net', 'wagered', 'house_busted', 'rounds', 'rolls')  ## per game, @see _sample_chunk()
+
+
+def _sample_chunk(table: Table, seed: int, start: int, stop: int) -> np.ndarray:
+    """Play games `start` up to `stop` at `table`, return a row of `SAMPLE_COLUMNS` per game."""
+    samples = np.empty((stop - start, len(SAMPLE_COLUMNS)), dtype=np.int64)
+    for row, rng in enumerate(spawn(seed, stop - start, start)):
+        statistics = table.play(rng=rng)
+        samples[row] = [statistics[column] for column in SAMPLE_COLUMNS]
+    return samples
+
+
+def _house_edge(samples: np.ndarray, z: float) -> (float, float, float):
+    """The ratio sum(house_net) / sum(wagered) and its interval from the standard error by the delta method."""
+    net, wagered = samples[:, 0].astype(float), samples[:, 1].astype(float)
+    if not wagered.sum(): return 0.0, 0.0, 0.0
+    edge = net.sum() / wagered.sum()
+    residuals = net - edge * wagered
+    error = residuals.std(ddof=1) / (math.sqrt(len(samples)) * wagered.mean())
+    return edge, edge - z * error, edge + z * error
+
+
+def _mean(column: int):
+    """A metric that's the mean of a column of the samples, with its interval from the standard error."""
+    def metric(samples: np.ndarray, z: float) -> (float, float, float):
+        values = samples[:, column].astype(float)
+        mean, error = values.mean(), values.std(ddof=1) / math.sqrt(len(values))
+        return mean, mean - z * error, mean + z * error
+    return metric
+
+
+def _rate(column: int):
+    """
+    A metric that's the rate of a 0/1 column of the samples, with its Wilson score interval. The normal interval of a
+    mean has no width at all while every sample is 0, e.g. before the first house bust, and would stop right away.
+    """
+    def metric(samples: np.ndarray, z: float) -> (float, float, float):
+        n = len(samples)
+        rate = samples[:, column].sum() / n
+        center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+        spread = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return rate, max(center - spread, 0.0), min(center + spread, 1.0)
+    return metric
+
+
+METRICS = dict(house_edge=_house_edge,
+               house_bust_rate=_rate(SAMPLE_COLUMNS.index('house_busted')),
+               mean_rounds=_mean(SAMPLE_COLUMNS.index('rounds')))  ## name -> function(samples, z) -> (estimate, low, high)
+
+
+def simulate_until(metric: str = 'house_edge', half_width: float = 0.01, table: Table = Table(), seed: int = None,
+                   confidence: float = 0.95, workers: int = None, batch: int = 1000, min_games: int = 1000,
+                   max_games: int = 10_000_000, chunk_size: int = 250) -> dict:
+    """
+    Play games at `table` in adaptive batches until the confidence interval of `metric` is at most `half_width` wide
+    on either side of the estimate.
+
+    :param metric: str, one of METRICS: `house_edge`, `house_bust_rate` or `mean_rounds`.
+    :param half_width: float, the target half width of the interval, in the metric's units.
+    :param table: Table, the configuration every game starts from.
+    :param seed: int|None, @see simulate()
+    :param confidence: float, the confidence level of the interval, from the normal approximation (Wilson's for
+                       `house_bust_rate`).
+    :param workers: int|None, @see simulate()
+    :param batch: int, the games in the first batch and the fewest games in any later batch.
+    :param min_games: int, never stop before this many games, too few games make the standard error unreliable.
+    :param max_games: int, stop here even if the interval is still too wide.
+    :param chunk_size: int, @see simulate()
+    :return: dict of `metric`, `estimate`, the achieved `half_width`, `low`, `high`, `confidence`, `converged` (False
+             if max_games stopped it), the `games` and `rolls` played, `batches`, `seconds` and `seed`.
+    """
+    if metric not in METRICS: raise ValueError(f'unknown metric {metric}, pick one of {sorted(METRICS)}')
+    if half_width <= 0: raise ValueError(f'need a positive half_width, got {half_width}')
+    if not 0 < confidence < 1: raise ValueError(f'need a confidence between 0 and 1, got {confidence}')
+    if seed is None: seed = np.random.SeedSequence().entropy
+    z = norm.ppf((1 + confidence) / 2)
+    started = time.perf_counter()
+
+    samples = np.empty((0, len(SAMPLE_COLUMNS)), dtype=np.int64)
+    batches, size = 0, min(batch, max_games)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        while True:
+            starts = range(len(samples), len(samples) + size, chunk_size)
+            stops = [min(start + chunk_size, len(samples) + size) for start in starts]
+            samples = np.concatenate([samples] + list(pool.map(_sample_chunk, [table] * len(starts),
+                                                                   [seed] * len(starts), starts, stops)))
+            batches += 1
+            estimate, low, high = METRICS[metric](samples, z)
+            achieved = (high - low) / 2
+            games = len(samples)
+            if games >= max_games or (games >= min_games and achieved <= half_width): break
+            # The half width shrinks with the square root of the games, aim for the games that get it just right but
+            #   at most double per batch, the first standard errors are rough.
+            needed = games * (achieved / half_width) ** 2 if achieved else 2 * games
+            size = int(min(max(needed - games, batch, min_games - games), games, max_games - games))
+
+    return dict(metric=metric,
+                estimate=float(estimate),
+                half_width=float(achieved),
+                low=float(low),
+                high=float(high),
+                confidence=confidence,
+                converged=bool(achieved <= half_width),
+                games=games,
+                rolls=int(samples[:, SAMPLE_COLUMNS.index('rolls')].sum()),
+                batches=batches,
+                seconds=time.perf_counter() - started,
+                seed=seed)
+
+
+def game_columns(table: Table) -> tuple:
+    """The columns of write_games()'s rows for games at `table`: a final balance per shooter, in shooting order."""
+    return (('game', 'rounds', 'rolls', 'wagered', 'house') + tuple(f'shooter{i}' for i in range(len(table.shooters)))
+            + ('house_busted', 'stalled'))
+
+
+def _row_chunk(table: Table, seed: int, start: int, stop: int) -> np.ndarray:
+    """Play games `start` up to `stop` at `table`, return a row of `game_columns(table)` per game."""
+    rows = np.empty((stop - start, len(game_columns(table))), dtype=np.int64)
+    for row, (i, rng) in enumerate(zip(range(start, stop), spawn(seed, stop - start, start))):
+        roll, house, shooters = table.setup(rng)
+        statistics = pycraps.game(roll=roll, house=house, shooters=shooters, starting_bet=table.starting_bet,
+                                  rules=table.rules)
+        rows[row] = ([i, statistics['rounds'], statistics['rolls'], statistics['wagered'], house.current_balance]
+                     + [s.current_balance for s in shooters] + [statistics['house_busted'], statistics['stalled']])
+    return rows
+
+
+def play_games(games: int, table: Table = Table(), seed: int = None, workers: int = None, chunk_size: int = 1000):
+    """Play `games` games like simulate() does, yield their rows (@see game_columns()) a chunk at a time, in order."""
+    if games <= 0: raise ValueError(f'need at least one game, got {games}')
+    if chunk_size <= 0: raise ValueError(f'need a positive chunk_size, got {chunk_size}')
+    starts = range(0, games, chunk_size)
+    stops = [min(start + chunk_size, games) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        yield from pool.map(_row_chunk, [table] * len(starts), [seed] * len(starts), starts, stops)
+
+
+def write_games(path: str, games: int, table: Table = Table(), seed: int = None, workers: int = None,
+                chunk_size: int = 1000, buffer: int = 1 << 20) -> dict:
+    """
+    Play `games` games at `table` and write one row per game to `path`, CSV with a header line or `.npz` with an
+    array per column. CSV is written a chunk at a time through a `buffer` sized buffer, so writing keeps up with the
+    workers. `.npz` is written once at the end, it holds a few dozen bytes per game in memory until then.
+
+    :return: dict of `path`, `games`, `seed`, `columns`, `seconds` and `games_per_sec`.
+    """
+    if not path.endswith(('.csv', '.npz')): raise ValueError(f'write .csv or .npz, not {path}')
+    if seed is None: seed = np.random.SeedSequence().entropy
+    columns = game_columns(table)
+    started = time.perf_counter()
+    chunks = play_games(games, table, seed, workers, chunk_size)
+    if path.endswith('.csv'):
+        with open(path, 'w', buffering=buffer) as f:
+            f.write(','.join(columns) + '\n')
+            for chunk in chunks:
+                f.write(''.join(','.join(map(str, row)) + '\n' for row in chunk.tolist()))
+    else:
+        rows = np.concatenate(list(chunks))
+        np.savez(path, **{column: rows[:, i] for i, column in enumerate(columns)})
+    seconds = time.perf_counter() - started
+    return dict(path=path, games=games, seed=seed, columns=columns, seconds=seconds, games_per_sec=games / seconds)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+Parameter sweeps for [pycraps](./pycraps.py): how a table's outcome changes with its starting bet and bankrolls.
+
+`grid()` turns ranges of `starting_bet`, `house`, `balance` (what each shooter starts with) and `players` into the
+tables of every combination. Combinations that make the same table are played once. `sweep()` plays `games` games at
+every table on one process pool, each chunk of games a task like `pycraps_sim.simulate()`. It streams a row per table
+as soon as all of the table's games are in, to a CSV file `out` too if given, and returns the rows in grid order.
+
+Every table plays the same random streams, game `i` at any table is seeded from `SeedSequence(seed, spawn_key=(i,))`.
+Neighbouring tables are compared on the same dice, which keeps the differences between them much less noisy than
+independent runs would, @see pycraps_variance.common(). The rows only depend on the seed, not on the workers.
+
+`refine()` starts from a coarse grid and spends more games where the outcome changes fastest along one parameter,
+the `axis`: in every step it finds the neighbouring tables whose `metric` differs the most, adds the table halfway
+between them and plays more games at both. The rows show how many games each table got.
+
+Example:
+    from interview.pycraps_sweep import refine, sweep
+    rows = sweep(games=2_000, starting_bet=[25, 50, 100], house=range(2_000, 10_001, 2_000), seed=42)
+    rows = refine('house', metric='house_bust_rate', house=[1_000, 5_000, 20_000], games=1_000, steps=3, seed=42)
+"""
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+
+from interview.pycraps import RuleSet, Statistics, Table
+from interview.pycraps_cache import ResultCache, key
+from interview.pycraps_sim import _play_chunk
+
+PARAMETERS = ('starting_bet', 'house', 'balance', 'players')  ## the axes of a grid
+COLUMNS = PARAMETERS + ('games', 'house_edge', 'house_bust_rate', 'house_bust_error', 'stalled_rate', 'mean_rounds',
+                        'mean_rolls')  ## the columns of a row, @see _row()
+
+
+def _values(v) -> tuple:
+    """A parameter's values, a single value is a range of one."""
+    return tuple(v) if hasattr(v, '__iter__') else (v,)
+
+
+def table_of(starting_bet: int, house: int, balance: int, players: int, rules: RuleSet = None) -> Table:
+    """The table of one grid point: `players` shooters starting with `balance` each."""
+    return Table(house=int(house), shooters=(int(balance),) * int(players), starting_bet=int(starting_bet), rules=rules)
+
+
+def parameters_of(table: Table) -> dict:
+    """The grid point of a table made by table_of()."""
+    return dict(starting_bet=table.starting_bet, house=table.house, balance=table.shooters[0], players=len(table.shooters))
+
+
+def grid(starting_bet=100, house=10_000, balance=1_000, players=4, rules: RuleSet = None) -> list:
+    """
+    The tables of every combination of the parameters, each a value or a range of values, without duplicates.
+    :return: list of Table, in the order of the combinations, the last parameter changing fastest.
+    """
+    points = product(*(_values(v) for v in (starting_bet, house, balance, players)))
+    return list(dict.fromkeys(table_of(*point, rules=rules) for point in points))  ## dict keeps the first of duplicates
+
+
+def _row(table: Table, statistics: Statistics) -> dict:
+    """A row of COLUMNS for the games played at `table`."""
+    games = statistics['games']
+    bust_rate = statistics['house_busted'] / games
+    return dict(parameters_of(table),
+                games=games,
+                house_edge=statistics['house_net'] / statistics['wagered'] if statistics['wagered'] else 0.0,
+                house_bust_rate=bust_rate,
+                house_bust_error=(bust_rate * (1 - bust_rate) / games) ** 0.5,
+                stalled_rate=statistics['stalled'] / games,
+                mean_rounds=statistics['rounds'] / games,
+                mean_rolls=statistics['rolls'] / games)
+
+
+def _play(pool, games: dict, seed: int, chunk_size: int):
+    """
+    Play games `start` up to `stop` at every table of `games`, {table: (start, stop)}, chunk by chunk on `pool`.
+    Yields (table, Statistics) as soon as all of a table's chunks are in. The chunks are merged in order.
+    """
+    chunks, futures = dict(), dict()
+    for table, (start, stop) in games.items():
+        starts = range(start, stop, chunk_size)
+        chunks[table] = [None] * len(starts)
+        for i, first in enumerate(starts):
+            futures[pool.submit(_play_chunk, table, seed, first, min(first + chunk_size, stop))] = (table, i)
+    for future in as_completed(futures):
+        table, i = futures[future]
+        chunks[table][i] = future.result()
+        if all(chunk is not None for chunk in chunks[table]):
+            result = Statistics()
+            for chunk in chunks.pop(table): result.merge(chunk)
+            yield table, result
+
+
+def _writer(out: str):
+    """A csv writer of rows to `out` with a header, and the file to close. (None, None) without `out`."""
+    if out is None: return None, None
+    f = open(out, 'w', newline='')
+    writer = csv.DictWriter(f, fieldnames=COLUMNS)
+    writer.writeheader()
+    return writer, f
+
+
+def sweep(games: int = 1_000, starting_bet=100, house=10_000, balance=1_000, players=4, rules: RuleSet = None,
+          seed: int = None, workers: int = None, chunk_size: int = 250, out: str = None, cache: ResultCache = None,
+          refresh: bool = False) -> list:
+    """
+    Play `games` games at every table of the grid, @see grid() for the parameters.
+
+    :param games: int, the games per table.
+    :param seed: int|None, the seed of the games' random streams, the same for every table. `None` picks one.
+    :param workers: int|None, the worker processes, `None` for one per cpu.
+    :param chunk_size: int, the games a worker plays per task.
+    :param out: str|None, a CSV file that gets each row as soon as it's done, in the order they finish.
+    :param cache: ResultCache|None, where the tables' statistics are looked up before playing and stored after, with
+                  a `seed` only. `None` bypasses the cache. @see pycraps_cache
+    :param refresh: bool, play every table again and overwrite its cache entry.
+    :return: list of dict, a row of COLUMNS per table in grid order, and the `seed` in each.
+    """
+    if games <= 0: raise ValueError(f'need at least one game, got {games}')
+    if chunk_size <= 0: raise ValueError(f'need a positive chunk_size, got {chunk_size}')
+    if cache is not None and seed is None: cache = None  ## a seedless sweep can't be repeated
+    if seed is None: seed = np.random.SeedSequence().entropy
+    tables = grid(starting_bet, house, balance, players, rules)
+    keys = {table: key('sweep', table, seed, games) for table in tables} if cache else dict()
+    rows = dict()
+    writer, f = _writer(out)
+
+    def done(table, statistics):
+        rows[table] = _row(table, statistics)
+        if writer:
+            writer.writerow(rows[table])
+            f.flush()  ## a row is visible as soon as it's done
+
+    try:
+        for table in keys:
+            statistics = None if refresh else cache.get(keys[table])
+            if statistics is not None: done(table, statistics)
+        todo = {table: (0, games) for table in tables if table not in rows}
+        if todo:  ## no pool at all when the cache had everything
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                for table, statistics in _play(pool, todo, seed, chunk_size):
+                    if cache: cache.put(keys[table], statistics)
+                    done(table, statistics)
+    finally:
+        if f: f.close()
+    return [dict(rows[table], seed=seed) for table in tables]
+
+
+def refine(axis: str, metric: str = 'house_bust_rate', steps: int = 2, split: int = 2, games: int = 1_000,
+           starting_bet=100, house=10_000, balance=1_000, players=4, rules: RuleSet = None, seed: int = None,
+           workers: int = None, chunk_size: int = 250) -> list:
+    """
+    Sweep a coarse grid, then refine it along `axis` where `metric` changes fastest.
+
+    Each of the `steps` steps looks at the neighbours along `axis`, among the tables that agree on the other parameters,
+    picks the `split` pairs whose `metric` differs the most, adds the table halfway between each pair (if there's a
+    whole number between them) and plays another `games` games at both tables of each pair.
+
+    :param axis: str, the parameter to refine, one of PARAMETERS.
+    :param metric: str, the column of the rows that steers the refinement, e.g. `house_bust_rate` or `house_edge`.
+    :return: list of dict, a row per table sorted by the parameters, the `seed` in each. @see sweep()
+    """
+    if axis not in PARAMETERS: raise ValueError(f'unknown axis {axis}, pick one of {PARAMETERS}')
+    if metric not in COLUMNS[len(PARAMETERS):]: raise ValueError(f'unknown metric {metric}, pick a column of {COLUMNS}')
+    if games <= 0: raise ValueError(f'need at least one game, got {games}')
+    if seed is None: seed = np.random.SeedSequence().entropy
+    results = dict()  ## table -> Statistics of all the games played there
+
+    def play(pool, todo: dict):
+        for table, statistics in _play(pool, todo, seed, chunk_size):
+            if table in results: results[table].merge(statistics)
+            else: results[table] = statistics
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        play(pool, {table: (0, games) for table in grid(starting_bet, house, balance, players, rules)})
+        for step in range(steps):
+            lines = dict()  ## the other parameters -> the tables along the axis
+            for table in results:
+                point = parameters_of(table)
+                lines.setdefault(tuple(v for k, v in point.items() if k != axis), []).append((point[axis], table))
+            pairs = []
+            for line in lines.values():
+                line.sort(key=lambda x: x[0])
+                for (a, low), (b, high) in zip(line, line[1:]):
+                    change = abs(_row(high, results[high])[metric] - _row(low, results[low])[metric])
+                    pairs.append((change, a, b, low, high))
+            todo = dict()
+            for change, a, b, low, high in sorted(pairs, key=lambda x: x[0], reverse=True)[:split]:
+                for table in (low, high):  ## more games at both ends, continuing their streams
+                    played = results[table]['games']
+                    todo[table] = (played, played + games)
+                middle = (a + b) // 2
+                if a < middle < b:
+                    todo[table_of(**dict(parameters_of(low), **{axis: middle}), rules=rules)] = (0, games)
+            if not todo: break
+            play(pool, todo)
+
+    rows = [dict(_row(table, statistics), seed=seed) for table, statistics in results.items()]
+    return sorted(rows, key=lambda row: tuple(row[p] for p in PARAMETERS))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+"""
+Variance reduction for [pycraps](./pycraps.py) estimates.
+
+The events worth estimating are often rare: the house going bust at a well funded table, a shooter keeping the dice
+for 50 rolls. Plain simulation spends almost every sample on games where nothing happens. Three modes do better:
+
+* `importance()`: play with tilted dice that make the rare event common, and weigh every sample by the likelihood
+  ratio of its rolls under fair dice over tilted dice. `WeightedRoll` keeps the ratio of the rolls it served, so a
+  sample that stops early is weighed by the rolls it used only. The estimate stays unbiased for the fair game, its
+  variance drops by orders of magnitude for a good tilt. Tilt each die with `TiltedDice` and `exponential_tilt()`, or
+  the throws of all dice at once with `total_tilt()`, e.g. fewer 7s for longer hands.
+* `antithetic()`: play every sample twice, the second time with mirrored dice drawn from the same uniforms, 1 - u
+  instead of u. The pair's errors partly cancel.
+* `common()`: compare two configurations, e.g. two tables, on the same dice. The difference is much less noisy than
+  the difference of two independent estimates.
+
+A sample is a function of a roll, returning a number, e.g. `house_ruin(table)` or `long_hand(50)`. Every mode returns
+the same report: the `estimate`, its `variance` and `std_error`, the effective sample size `ess` and the `samples` and
+`rolls` it took. `ess` is Kish's effective sample size of the weights for `importance()` and the number of independent
+plain samples with the same variance for the other modes.
+
+Example:
+    from interview.pycraps_variance import importance, long_hand, total_tilt
+    report = importance(long_hand(50), samples=10_000, p=total_tilt({7: 0.3}), seed=1)
+    print(report['estimate'], report['std_error'], report['ess'])
+"""
+
+import math
+
+import numpy as np
+
+from interview.pycraps import DicePass, Dice, Roll, Table, game, win
+
+
+class TiltedDice(Dice):
+    """Dice whose faces come up with probabilities `p` instead of all equally probable."""
+
+    def __init__(self, values=None, p=None, rng=None):
+        """
+        :param values: the faces, `None` for six sides, @see Dice
+        :param p: the probability of each face, `None` for equally probable faces.
+        """
+        super().__init__(values, rng)
+        self.p = _probabilities(p, (len(self.values),))
+
+    def roll(self):
+        return self.values[self.rng.choice(len(self.values), p=self.p)]
+
+    def roll_batch(self, n: int, rng: np.random.Generator = None) -> np.ndarray:
+        return self._faces[(rng or self.rng).choice(len(self._faces), size=n, p=self.p)]
+
+
+def _probabilities(p, shape: tuple) -> np.ndarray:
+    """`p` checked to be a probability distribution of `shape`, equally probable outcomes for `None`."""
+    p = np.full(shape, 1.0 / np.prod(shape)) if p is None else np.asarray(p, dtype=float)
+    if p.shape != shape or (p <= 0).any() or not math.isclose(p.sum(), 1.0):
+        raise ValueError(f'need a positive probability for each of the {shape} outcomes, summing to 1, got {p}')
+    return p
+
+
+def exponential_tilt(values, theta: float) -> np.ndarray:
+    """
+    Probabilities for the faces `values` of TiltedDice, proportional to exp(theta * face). A tilt per die moves every
+    total at once, it suits events driven by the size of the totals.
+    """
+    weights = np.exp(theta * np.asarray(list(values), dtype=float))
+    return weights / weights.sum()
+
+
+def total_tilt(factors: dict, dice: int = 2, sides: int = 6) -> np.ndarray:
+    """
+    Probabilities for every throw of `dice` fair dice with `sides` sides, each throw's fair probability times the
+    factor of its total in `factors` (default 1), renormalized. E.g. `total_tilt({7: 0.5})` makes 7 about half as
+    likely and keeps the odds among the other totals, just right for long hands. @see WeightedRoll
+    """
+    totals = sum(np.indices((sides,) * dice)) + dice  ## the total of every throw, faces from 1
+    weights = np.vectorize(lambda total: factors.get(int(total), 1.0))(totals)
+    return weights / weights.sum()
+
+
+class WeightedRoll(Roll):
+    """
+    A Roll that draws whole throws from a distribution `p` over the throws instead of fair dice, and keeps the log
+    likelihood ratio, fair over `p`, of the throws it served. `p` is the joint distribution of the dice's faces, shaped
+    (faces of dice 0, faces of dice 1, ...). Without `p` it's the product of the dice's own probabilities, @see
+    TiltedDice, which for fair dice is a plain Roll with weight 1.
+
+    Throws come from inverting the cdf of `p`, so a uniform u always rolls the same throw. A `mirrored` roll walks the
+    cdf backwards: u rolls what 1 - u rolls unmirrored, the antithetic throw.
+    """
+
+    def __init__(self, dice=None, p=None, mirrored: bool = False, block_size: int = 256, rng=None):
+        super().__init__(dice, block_size=block_size, rng=rng)
+        shape = tuple(len(d.values) for d in self.dice)
+        if p is None:
+            p = np.ones(shape)
+            for axis, d in enumerate(self.dice):
+                p = p * np.expand_dims(getattr(d, 'p', np.full(shape[axis], 1.0 / shape[axis])),
+                                       [a for a in range(len(shape)) if a != axis])
+        self.p = _probabilities(p, shape)
+        indexes = np.array(list(np.ndindex(shape)))  ## the face indexes of every throw, in the order of p.ravel()
+        throws = np.column_stack([np.asarray(d.values)[indexes[:, axis]] for axis, d in enumerate(self.dice)])
+        flat = self.p.ravel()
+        # The cdf runs from unlikely totals to likely totals, so a mirrored throw swaps a likely total, e.g. 7, for
+        #   unlikely ones, e.g. 2, 3, 11 or 12. Mirroring 7 into 7 would make antithetic samples correlate.
+        totals = throws.sum(axis=1)
+        total_p = np.bincount(totals - totals.min(), weights=flat)[totals - totals.min()]
+        order = np.lexsort((totals, total_p))
+        self._throws, flat = throws[order], flat[order]
+        if mirrored: self._throws, flat = self._throws[::-1], flat[::-1]
+        self._cdf = np.cumsum(flat)
+        self._cdf[-1] = 1.0  ## no throw falls off the end through rounding
+        log_ratios = -np.log(flat * flat.size)  ## log(fair / p) for every throw
+        self._tilted = bool(np.abs(log_ratios).max() > 1e-12)
+        self._log_ratios = dict(zip(map(tuple, self._throws.tolist()), log_ratios.tolist()))
+        self.restart()
+
+    def restart(self):
+        """Start a new sample: no rolls, weight 1."""
+        self.log_weight = 0.0
+        self.rolls = 0
+        return self
+
+    @property
+    def weight(self) -> float:
+        return math.exp(self.log_weight)
+
+    def _draw(self, n: int) -> np.ndarray:
+        rng = self.rng or self._generators()[0]
+        return self._throws[np.searchsorted(self._cdf, rng.random(n), side='right')]
+
+    def roll(self):
+        result = super().roll()
+        self.rolls += 1
+        if self._tilted: self.log_weight += self._log_ratios[result]
+        return result
+
+
+def house_ruin(table: Table = Table()):
+    """A sample: play a game at `table`, 1 if the house busts, else 0."""
+    def sample(roll: Roll) -> int:
+        _, house, shooters = table.setup()
+        return game(roll=roll, house=house, shooters=shooters, starting_bet=table.starting_bet)['house_busted']
+    return sample
+
+
+def long_hand(rolls: int = 50):
+    """A sample: a shooter's hand, 1 if the shooter keeps the dice for at least `rolls` rolls, else 0."""
+    def sample(roll: Roll) -> int:
+        point, dice_pass = None, DicePass.STAY
+        for n in range(rolls):
+            if dice_pass == DicePass.NEXT: return 0
+            decision, dice_pass, point, payout = win(sum(roll.roll()), point)
+        return 1  ## stop as soon as it's decided, the weight covers the rolls used only
+    return sample
+
+
+def _play(sample, roll: WeightedRoll) -> (float, float, int):
+    """One sample on `roll`, returns (value, weight, rolls)."""
+    roll.restart()
+    return sample(roll), roll.weight, roll.rolls
+
+
+def _report(values: np.ndarray, variance: float, ess: float, rolls: int) -> dict:
+    estimate = float(values.mean())
+    return dict(estimate=estimate, variance=variance, std_error=math.sqrt(variance), ess=float(ess),
+                samples=len(values), rolls=rolls)
+
+
+def importance(sample, samples: int, p=None, seed=None, dice=None) -> dict:
+    """
+    Estimate the mean of `sample` for fair dice from `samples` samples rolled with dice tilted to `p`.
+
+    :param sample: function(roll) -> number, e.g. house_ruin(table).
+    :param samples: int, the number of samples.
+    :param p: the probabilities of every throw, e.g. total_tilt({7: 0.5}), `None` for the dice's own probabilities.
+    :param seed: the random stream, e.g. an int. @see spawn()
+    :param dice: the dice, e.g. TiltedDice, `None` for a pair of fair six sided dice. Fair dice and no `p` is plain
+                 simulation.
+    :return: dict, @see the module docstring
+    """
+    if samples <= 1: raise ValueError(f'need at least two samples, got {samples}')
+    roll = WeightedRoll(dice, p, rng=seed)
+    values, weights, rolls = np.array([_play(sample, roll) for i in range(samples)], dtype=float).T
+    weighted = values * weights
+    ess = weights.sum() ** 2 / (weights ** 2).sum()
+    return _report(weighted, float(weighted.var(ddof=1) / samples), ess, int(rolls.sum()))
+
+
+def antithetic(sample, samples: int, p=None, seed=None, dice=None) -> dict:
+    """
+    Like importance(), with `samples` antithetic pairs: each sample is played on the dice and again on the mirrored
+    dice with the same uniforms. The estimate is the mean of the pairs' means.
+    """
+    if samples <= 1: raise ValueError(f'need at least two samples, got {samples}')
+    pairs, rolls = np.empty(samples), 0
+    singles = np.empty(2 * samples)
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(samples)):
+        plain = WeightedRoll(dice, p, rng=np.random.default_rng(child))
+        mirror = WeightedRoll(dice, p, mirrored=True, rng=np.random.default_rng(child))
+        (a, a_weight, a_rolls), (b, b_weight, b_rolls) = _play(sample, plain), _play(sample, mirror)
+        singles[2 * i], singles[2 * i + 1] = a * a_weight, b * b_weight
+        pairs[i] = (singles[2 * i] + singles[2 * i + 1]) / 2
+        rolls += a_rolls + b_rolls
+    variance = float(pairs.var(ddof=1) / samples)
+    return _report(pairs, variance, singles.var(ddof=1) / variance if variance else 2 * samples, rolls)
+
+
+def common(sample, other, samples: int, p=None, seed=None, dice=None) -> dict:
+    """
+    Estimate mean(sample) - mean(other) with common random numbers: sample `i` of both is played on the same dice.
+
+    :param sample: function(roll) -> number, the first configuration, e.g. house_ruin(Table(house=5_000)).
+    :param other: function(roll) -> number, the configuration to compare to.
+    :return: dict, @see the module docstring, `ess` compares with independent samples of both configurations.
+    """
+    if samples <= 1: raise ValueError(f'need at least two samples, got {samples}')
+    a, b, rolls = np.empty(samples), np.empty(samples), 0
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(samples)):
+        for values, play in ((a, sample), (b, other)):
+            roll = WeightedRoll(dice, p, rng=np.random.default_rng(child))
+            value, weight, used = _play(play, roll)
+            values[i] = value * weight
+            rolls += used
+    differences = a - b
+    variance = float(differences.var(ddof=1) / samples)
+    independent = (a.var(ddof=1) + b.var(ddof=1)) / samples  ## the variance without common random numbers
+    return _report(differences, variance, samples * independent / variance if variance else samples, rolls)
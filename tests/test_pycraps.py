@@ -1,3 +1,9 @@
+import os
+import subprocess
+import sys
+from itertools import islice
+
+import numpy as np
 import pytest
 import testfixtures as tf
 import interview.pycraps as p
@@ -72,11 +78,206 @@ def test_roll_10_default_dice():
         # Every slot in the roll is in the standard range.
         assert all( slot for slot in r if 1<= slot <= 6 )
 
+def test_roll_batch_shape():
+    """A batch of rolls is an array with one row per throw and one column per dice."""
+    roller = p.Roll(dice=[p.Dice(), p.Dice(values=[1, 2, 3])])
+    batch = roller.roll_batch(1000)
+    assert batch.shape == (1000, 2)
+    assert ((1 <= batch[:, 0]) & (batch[:, 0] <= 6)).all()
+    assert ((1 <= batch[:, 1]) & (batch[:, 1] <= 3)).all()
+
+
+def test_roll_buffer_refills():
+    """roll() keeps serving tuples across block boundaries."""
+    roller = p.Roll(block_size=3)
+    throws = [roller.roll() for i in range(10)]
+    assert all(isinstance(t, tuple) and len(t) == 2 for t in throws)
+
+
+def test_roll_distribution():
+    """The exact distribution of the total, by direct convolution for small dice and by FFT for large ones."""
+    distribution = p.Roll().distribution()
+    assert distribution == pytest.approx({t: (6 - abs(t - 7)) / 36 for t in range(2, 13)})
+    assert p.Roll(dice=[p.Dice(values=[1, 3]), p.Dice(values=[0, 10])]).distribution() == pytest.approx(
+        {1: 0.25, 3: 0.25, 11: 0.25, 13: 0.25})
+    big = p.Roll(dice=[p.Dice(values=list(range(0, 200, 2))) for i in range(2)]).distribution()
+    assert set(range(0, 397, 2)) <= set(big)
+    assert all(big.get(odd, 0.0) == pytest.approx(0.0, abs=1e-12) for odd in range(1, 397, 2))  ## only rounding noise
+    assert sum(big.values()) == pytest.approx(1.0)
+    assert big[198] == pytest.approx(100 / 100 ** 2)
+    with pytest.raises(ValueError):
+        p.Roll(dice=[p.Dice(values=['a', 'b'])]).distribution()
+
+
+def test_alias_table():
+    """Alias draws follow their probabilities, one at a time or batched."""
+    table = p.AliasTable([5, 6, 7], [0.2, 0.8, 0.0])
+    rng = np.random.default_rng(0)
+    assert table.draw(rng) in (5, 6)
+    draws = table.draw(rng, 100_000)
+    assert not (draws == 7).any()
+    assert (draws == 5).mean() == pytest.approx(0.2, abs=0.01)
+    with pytest.raises(ValueError):
+        p.AliasTable([1, 2], [0.5])
+
+
+def test_totals_roll():
+    """A totals roll throws 1-tuples with the totals' distribution, replays by seed and plays a game."""
+    roller = p.Roll(rng=1, totals=True)
+    throws = [roller.roll() for i in range(36_000)]
+    assert all(len(t) == 1 for t in throws)
+    assert sum(t == (7,) for t in throws) / len(throws) == pytest.approx(1 / 6, abs=0.01)
+    assert p.Roll(rng=1, totals=True).roll_batch(5).tolist() == [list(t) for t in throws[:5]]
+    statistics = p.game(roll=p.FixedRoll(rng=2, totals=True), house=p.Bettor('house', 1_000),
+                        shooters=[p.Shooter('Mike', 1_000)])
+    assert statistics['games'] == 1
+
+
+def test_fixed_roll_limit():
+    """FixedRoll still stops runaway loops, for single and batched rolls, until reset."""
+    roller = p.FixedRoll(max_rolls=5)
+    for i in range(6): roller.roll()
+    with pytest.raises(ValueError):
+        roller.roll()
+    roller.reset()
+    assert roller.roll_batch(6).shape == (6, 2)
+    with pytest.raises(ValueError):
+        roller.roll_batch(1)
+
+
+def test_seeded_roll_repeats():
+    """The same seed rolls the same throws."""
+    one, two = p.Roll(rng=42, block_size=7), p.Roll(rng=42, block_size=7)
+    assert [one.roll() for i in range(20)] == [two.roll() for i in range(20)]
+
+
+def test_roll_state_roundtrip():
+    """A snapshot taken mid block continues with exactly the same throws."""
+    roller = p.FixedRoll(max_rolls=1_000, rng=7)
+    roller.block_size = 8
+    for i in range(13): roller.roll()
+    state = roller.get_state()
+    expected = [roller.roll() for i in range(20)]
+    restored = p.FixedRoll(max_rolls=1_000, rng=99).set_state(state)
+    restored.block_size = 8
+    assert [restored.roll() for i in range(20)] == expected
+
+
+def test_unseeded_roll_state_is_private():
+    """Restoring an unseeded roll rewinds that roll only, not the shared generator the other rolls draw from."""
+    one, other = p.Roll(block_size=8), p.Roll(block_size=8)
+    state = one.get_state()
+    expected = [one.roll() for i in range(20)]
+    untouched = other.get_state()
+    one.set_state(state)
+    assert [one.roll() for i in range(20)] == expected
+    assert other.get_state() == untouched
+    shared = p.Roll(dice=[p.Dice(), p.Dice(rng=1)])  ## one die on the shared generator, one on its own
+    with pytest.raises(ValueError):
+        shared.set_state(shared.get_state())
+
+
+def test_spawn_and_jumped():
+    """Spawned and jumped streams are reproducible and differ from each other."""
+    assert [g.integers(1 << 30) for g in p.spawn(3, 4)] == [g.integers(1 << 30) for g in p.spawn(3, 4)]
+    draws = [g.integers(1 << 30, size=4).tolist() for g in p.spawn(3, 4) + p.jumped(np.random.default_rng(3), 4)]
+    assert len(set(map(tuple, draws))) == len(draws)
+    rng = np.random.default_rng(3)
+    assert [g.integers(1 << 30) for g in p.spawn(rng, 2)] == [g.integers(1 << 30) for g in p.spawn(rng, 2)]
+
+
+def test_dice_roll_buffered():
+    """Single rolls come from blocks of faces, the same faces as a batch from the same stream."""
+    dice = p.Dice(rng=5)
+    rolls = [dice.roll() for i in range(p.Dice.BLOCK + 10)]
+    assert rolls[:p.Dice.BLOCK] == p.Dice(rng=5).roll_batch(p.Dice.BLOCK).tolist()
+    assert set(rolls) == set(range(1, 7))
+
+
+def test_seeded_game_repeats():
+    """The same seed replays a game roll for roll."""
+    def play(seed):
+        events = []
+        roll, house, shooters = p.Table(house=400, shooters=(200, 200)).setup()
+        p.game(roll=roll, house=house, shooters=shooters, sinks=[events.append], rng=seed)
+        return [e.faces for e in events if isinstance(e, p.RollEvent)]
+    assert play(123) == play(123)
+    assert play(123) != play(124)
+
+
+def test_game_rounds():
+    """The generator yields a record per decided round and returns what game() returns for the same seed."""
+    table = p.Table(house=400, shooters=(200, 200))
+    rounds = table.rounds(rng=7)
+    records = []
+    while True:
+        try:
+            records.append(next(rounds))
+        except StopIteration as over:
+            statistics = over.value
+            break
+    tf.compare(statistics, expected=table.play(rng=7))
+    assert [r.round for r in records] == list(range(statistics['rounds']))
+    assert sum(r.rolls for r in records) == statistics['rolls']
+    assert all(r.point == 0 or r.point in p.POINTS for r in records)
+    assert records[-1].house == 400 + statistics['house_net']
+    assert all(len(r.balances) == 2 for r in records)
+
+
+def test_profiler():
+    """The profiler counts every phase of every round and doesn't change the game."""
+    table = p.Table(house=400, shooters=(200, 200))
+    profiler = p.Profiler()
+    statistics = table.play(rng=7, sinks=[lambda event: None], profiler=profiler)
+    tf.compare(statistics, expected=table.play(rng=7))
+    profile = profiler.as_dict()
+    assert profile['rounds'] == profile['sampled'] == statistics['rounds']
+    assert profile['roll']['calls'] == profile['decide']['calls'] == statistics['rolls']
+    assert profile['settle']['calls'] == profile['statistics']['calls'] == statistics['rounds']
+    assert profile['events']['calls'] == statistics['rolls'] + statistics['rounds']
+    assert sum(profile[phase]['share'] for phase in p.Profiler.PHASES) == pytest.approx(1)
+    lines = profiler.collapsed().splitlines()
+    assert lines and all(line.startswith('game;play_round;') and line.split(' ')[1].isdigit() for line in lines)
+
+
+def test_profiler_samples():
+    """Sampling every 3rd round times a third of the rounds."""
+    profiler = p.Profiler(every=3)
+    statistics = p.Table(house=400, shooters=(200, 200)).play(rng=7, profiler=profiler)
+    assert profiler.rounds == statistics['rounds']
+    assert profiler.sampled == profiler.calls['settle'] == (statistics['rounds'] + 2) // 3
+    assert profiler.calls['events'] == 0
+
+
+def test_game_rounds_stop_early():
+    """A consumer can stop after a few rounds, the rest of the game is never played."""
+    events = []
+    first = list(islice(p.Table(house=100_000).rounds(rng=1, sinks=[events.append]), 3))
+    assert len(first) == 3
+    assert sum(isinstance(e, p.DecisionEvent) for e in events) == 3
+    assert p.finish(p.Table(house=400, shooters=(200, 200)).rounds(rng=7))['games'] == 1
+
+
 def test_statistical_distribution():
     """Is the roller distributed randomly?"""
     assert True
 
 
+def test_shooter_history_cap():
+    """A shooter remembers only the latest throws, oldest first."""
+    s = p.Shooter(name='Mike', balance=1_000, history_cap=3)
+    for throw in [(1, 1), (1, 2), (1, 3), (1, 4), (1, 5)]: s.remember(throw)
+    assert s.history == [(1, 3), (1, 4), (1, 5)]
+    assert s.history_array().tolist() == [[1, 3], [1, 4], [1, 5]]
+    assert not s.history_array().flags.writeable
+
+
+def test_shooter_history_off():
+    s = p.Shooter(name='Mike', balance=1_000, history_cap=0)
+    s.shoot(p.Roll())
+    assert s.past_throws == []
+
+
 # test the various game rules here
 def test_win_no_point_7():
     decision, dice_pass, point, payout = p.win(7)
@@ -105,6 +306,26 @@ def test_win_point_5():
     assert point == None
     assert payout == p.BetPayout.WIN
 
+def test_win_table_matches_rules():
+    """The compiled table makes the same decisions as the rules, including totals outside the table."""
+    for point in (None,) + p.POINTS + (15,):
+        for total in range(2, 19):
+            assert p.win(total, point) == p._win_rules(total, point)
+
+
+def test_win_many():
+    """win_many() decides whole arrays of rolls like win() decides them one at a time."""
+    points = np.array([0] * 11 + [5] * 11 + [10] * 11)
+    totals = np.tile(np.arange(2, 13), 3)
+    decisions, passes, next_points, payouts = p.win_many(totals, points)
+    for i in range(len(totals)):
+        decision, dice_pass, point, payout = p.win(int(totals[i]), int(points[i]) or None)
+        assert decisions[i] == decision.value
+        assert passes[i] == dice_pass.value
+        assert next_points[i] == (point or 0)
+        assert payouts[i] == payout
+
+
 def test_win_point_5_with_SequenceRoll():
     """
     This pattern of testing lets you test the `win()` function with a sequence of rolls, either in a for loop or
@@ -113,8 +334,10 @@ def test_win_point_5_with_SequenceRoll():
     """
     seq = p.SequenceRoll([(4, 1), (1,4)])
     point = None
-    for r in seq.roll():
-        decision, dice_pass, point, payout = p.win(p, point)
+    for i in range(len(seq)):
+        r = seq.roll()
+        decision, dice_pass, point, payout = p.win(sum(r), point)
+    assert seq.roll() is None  ## out of rolls
 
     # At the end of the sequence
     assert decision == p.Round.WIN
@@ -123,3 +346,315 @@ def test_win_point_5_with_SequenceRoll():
     assert payout == p.BetPayout.WIN
 
 
+
+
+# game() events
+def small_game(sinks, seed=5, rules=None):
+    """A short seeded game at a small table."""
+    table = p.Table(house=400, shooters=(200, 200), starting_bet=100)
+    roll, house, shooters = table.setup(np.random.default_rng(seed))
+    return p.game(roll=roll, house=house, shooters=shooters, starting_bet=table.starting_bet, sinks=sinks, rules=rules)
+
+
+def test_game_events():
+    """Every roll, round and settlement is an event, in order."""
+    events = []
+    statistics = small_game([events.append])
+    assert isinstance(events[0], p.StartEvent)
+    assert isinstance(events[-1], p.OverEvent)
+    assert sum(isinstance(e, p.RollEvent) for e in events) == statistics['rolls']
+    assert sum(isinstance(e, p.DecisionEvent) for e in events) == statistics['rounds']
+    assert sum(isinstance(e, p.SettlementEvent) for e in events) == statistics['rounds']
+    for e in events:
+        if isinstance(e, p.PointEvent): assert e.point in p.POINTS
+
+
+def test_game_without_sinks():
+    """Sinks only watch, the game plays the same without them."""
+    assert small_game(None) == small_game([lambda event: None])
+
+
+def test_game_statistics():
+    """The accumulators agree with the counts and with each other."""
+    statistics = small_game(None)
+    assert isinstance(statistics, p.Statistics)
+    assert sum(statistics['totals'].values()) == statistics['rolls']
+    assert sum(r for r, n in statistics['shooters'].values()) == statistics['rounds']
+    assert sum(n for r, n in statistics['shooters'].values()) == statistics['rolls']
+    assert statistics['outcomes'].n == statistics['rounds']
+    assert round(statistics['outcomes'].mean * statistics['rounds']) == statistics['house_net']
+    assert all(made <= set_ for set_, made in statistics['points'].values())
+    assert statistics['drawdowns']['house'].max_drawdown >= 0
+    summary = statistics.summary()
+    assert summary['games'] == 1
+    assert set(summary['point_hit_rates']) <= set(p.POINTS)
+
+
+def test_welford_merge():
+    """Merging running statistics is the same as running over both streams."""
+    xs = [3, -1, 4, 1, -5, 9, 2, -6]
+    a, b, both = p.Welford(), p.Welford(), p.Welford()
+    for x in xs[:3]: a.add(x)
+    for x in xs[3:]: b.add(x)
+    for x in xs: both.add(x)
+    a.merge(b)
+    assert a.n == both.n
+    assert abs(a.mean - np.mean(xs)) < 1e-12
+    assert abs(a.variance - np.var(xs, ddof=1)) < 1e-12
+
+
+def test_statistics_merge():
+    """Counts add up, histograms add up key by key, drawdowns keep the worst."""
+    one, two = small_game(None, seed=1), small_game(None, seed=2)
+    merged = p.Statistics().merge(one).merge(two)
+    assert merged['games'] == 2
+    assert merged['rolls'] == one['rolls'] + two['rolls']
+    for total in merged['totals']:
+        assert merged['totals'][total] == one['totals'].get(total, 0) + two['totals'].get(total, 0)
+    assert merged['drawdowns']['house'].max_drawdown == max(one['drawdowns']['house'].max_drawdown,
+                                                             two['drawdowns']['house'].max_drawdown)
+    assert one['games'] == 1  ## merging copies, it doesn't share
+
+
+def test_bettor_table_plays_like_shooters():
+    """A BettorTable settles differently but the game, its statistics and the balances come out the same."""
+    table = p.Table(house=2_000, shooters=(300, 500, 100, 700), starting_bet=100)
+    roll, house, shooters = table.setup(np.random.default_rng(3))
+    expected = p.game(roll=roll, house=house, shooters=shooters, starting_bet=table.starting_bet)
+    roll, house, _ = table.setup(np.random.default_rng(3))
+    seats = p.BettorTable([s.name for s in shooters], table.shooters)
+    assert p.game(roll=roll, house=house, shooters=seats, starting_bet=table.starting_bet) == expected
+    assert [(s.current_balance, s.min, s.max) for s in seats] == [(s.current_balance, s.min, s.max) for s in shooters]
+
+
+def test_bettor_table_seats():
+    """Seats read and write through to the table's arrays, like Shooters."""
+    seats = p.BettorTable.of(3, 500)
+    assert len(seats) == 3 and seats[1].name == 'shooter1'
+    assert list(seats.place(600)) == [False] * 3
+    seats[0].current_balance = 800
+    assert list(seats.place(600)) == [True, False, False]
+    assert seats.settle(2) == 1_200
+    assert (seats[0].current_balance, seats[0].max, seats[0].current_bet) == (2_000, 2_000, 0)
+    seats[0].win(-1_000)
+    assert seats[0].min == 500 and seats.drawdowns()['shooter0'].max_drawdown == 1_000
+    with pytest.raises(Exception):
+        p.BettorTable(['broke'], [0])
+
+
+class Throws:
+    """Dice that throw the given totals' faces in order, for rounds with a known outcome."""
+
+    def __init__(self, *throws):
+        self.throws = list(throws)
+
+    def reset(self):
+        pass
+
+    def roll(self):
+        return self.throws.pop(0)
+
+
+def settle(rules, *throws, balance=1_000):
+    """Play one round of `throws` with `rules`, return what the shooter won."""
+    house, shooter = p.Bettor('house', 10_000), p.Shooter('Mike', balance)
+    p.play_round(Throws(*throws), house, shooter, [shooter], 100, p.Statistics(), rules=rules)
+    assert house.current_balance + shooter.current_balance == 10_000 + balance
+    return shooter.current_balance - balance
+
+
+def test_rules_pass_line_is_the_default():
+    """The pass line as a rule set plays exactly like the built in rules."""
+    assert small_game(None) == small_game(None, rules=p.RuleSet.of(**{'pass': 1}))
+
+
+def test_rules_dont_pass():
+    """Betting against the shooter: craps wins, 12 pushes, a natural or a made point loses."""
+    rules = p.RuleSet.of(dont_pass=1)
+    assert settle(rules, (1, 2)) == 100
+    assert settle(rules, (6, 6)) == 0
+    assert settle(rules, (5, 6)) == -100
+    assert settle(rules, (2, 2), (3, 6), (1, 3)) == -100
+    assert settle(rules, (2, 2), (3, 4)) == 100
+
+
+def test_rules_odds_and_field():
+    rules = p.RuleSet.of(**{'pass': 1, 'odds': 2})
+    assert settle(rules, (2, 2), (1, 3)) == 100 + 2 * 200  ## odds on 4 pay 2 to 1
+    assert settle(rules, (3, 3), (2, 4)) == 100 + 2 * 120  ## odds on 6 pay 6 to 5
+    assert settle(rules, (3, 4)) == 100  ## the odds weren't working yet, they come back
+    assert settle(rules, (2, 2), (3, 4)) == -300
+    assert settle(rules, (2, 2), (1, 3), balance=250) == 0  ## can't cover the odds, doesn't bet
+    field = p.RuleSet.of(field=1)
+    assert settle(field, (6, 6)) == 200
+    assert settle(field, (2, 3), (1, 1), (1, 4)) == -100  ## a one roll bet, only the first roll counts
+
+
+def test_rules_compiled():
+    """Every state of two six sided dice is compiled, a roll is one lookup."""
+    rules = p.RuleSet.of(**{'pass': 1, 'odds': 1, 'field': 1})
+    assert len(rules.steps) == rules.all * 7 * 11
+    decision, dice_pass, point, payout, open_bets, net, decided = rules.steps[(rules.all, None, 12)]
+    assert (decision, open_bets, net, decided) == (p.Round.LOSE, 0b010, -1 + 2, 2)
+    with pytest.raises(ValueError):
+        p.RuleSet.of(hardways=1)
+
+
+def test_rules_wagered():
+    """Only the bets decided in a round are wagered, the odds returned on a come out natural aren't."""
+    rules = p.RuleSet.of(**{'pass': 1, 'odds': 2})
+    for throws, wagered in (([(3, 4)], 100), ([(2, 2), (1, 3)], 300), ([(2, 2), (3, 4)], 300)):
+        statistics = p.Statistics()
+        shooter = p.Shooter('Mike', 1_000)
+        p.play_round(Throws(*throws), p.Bettor('house', 10_000), shooter, [shooter], 100, statistics, rules=rules)
+        assert statistics['wagered'] == wagered
+
+
+def test_rules_payout_is_the_money_moved():
+    """Under a RuleSet the events and the round report the rule set's net payout, not win()'s."""
+    rules = p.RuleSet.of(**{'pass': 1, 'odds': 2})
+    events, shooter = [], p.Shooter('Mike', 1_000)
+    decision, dice_pass, payout = p.play_round(Throws((2, 2), (1, 3)), p.Bettor('house', 10_000), shooter, [shooter],
+                                               100, p.Statistics(), sinks=[events.append], rules=rules)
+    assert payout == 1 + 2 * 2 == (shooter.current_balance - 1_000) / 100
+    assert [e.payout for e in events if isinstance(e, p.RollEvent)] == [0, 5]
+    assert [e.payout for e in events if isinstance(e, p.DecisionEvent)] == [5]
+
+
+def test_rules_house_edge():
+    """The exact edge of the pass line with double odds: the pass line's 7/495 over 1 + 2 * 24/36 wagered."""
+    rules = p.RuleSet.of(**{'pass': 1, 'odds': 2})
+    totals = p.Roll().distribution()
+    expected = {(mask, point): (0.0, 0.0) for mask, point, total in rules.steps}  ## -> (net, decided) until decided
+    for i in range(200):
+        following = dict()
+        for mask, point in expected:
+            net = decided = 0.0
+            for total, q in totals.items():
+                decision, dice_pass, next_point, payout, open_bets, won, stakes = rules.steps[(mask, point, total)]
+                later = expected.get((open_bets, next_point), (0.0, 0.0)) if decision == p.Round.DRAW else (0.0, 0.0)
+                net, decided = net + q * (won + later[0]), decided + q * (stakes + later[1])
+            following[(mask, point)] = (net, decided)
+        expected = following
+    net, decided = expected[(rules.all, None)]
+    assert decided == pytest.approx(1 + 2 * 24 / 36)
+    assert -net / decided == pytest.approx(7 / 495 / (1 + 2 * 24 / 36))  ## 0.606%
+
+
+def test_game_stalls():
+    """Nobody can cover the bets anymore: the game ends instead of passing the dice forever."""
+    table = p.Table(house=10_000, shooters=(150,), starting_bet=100)
+    statistics = table.play(rng=4)
+    assert statistics['stalled'] + statistics['house_busted'] == 1
+
+
+class Killed(Exception):
+    pass
+
+
+def test_checkpoint_resume(tmp_path):
+    """A game killed halfway and resumed from its last checkpoint ends exactly like the game that wasn't killed."""
+    table = p.Table(house=3_000, shooters=(500, 700, 900), starting_bet=100)
+    roll, house, shooters = table.setup(np.random.default_rng(8))
+    expected = p.game(roll=roll, house=house, shooters=shooters, starting_bet=100)
+    expected_balances = [s.current_balance for s in shooters]
+    assert expected['rounds'] > 40
+
+    def kill(event):
+        if isinstance(event, p.SettlementEvent) and event.round == 37: raise Killed()
+
+    path = str(tmp_path / 'game.ckpt')
+    checkpoint = p.Checkpoint(path, every=5)
+    roll, house, shooters = table.setup(np.random.default_rng(8))
+    with pytest.raises(Killed):
+        p.game(roll=roll, house=house, shooters=shooters, starting_bet=100, sinks=[kill], checkpoint=checkpoint)
+    assert checkpoint.saved == 7
+    assert p.Checkpoint.load(path)['statistics']['rounds'] == 35
+
+    events = []
+    assert p.resume(path, sinks=[events.append]) == expected
+    assert not isinstance(events[0], p.StartEvent) and isinstance(events[-1], p.OverEvent)
+    assert [s.current_balance for s in p.Checkpoint.load(path)['shooters']] != expected_balances  ## the file is left as it was
+    assert not (tmp_path / 'game.ckpt.tmp').exists()
+
+
+def test_checkpoint_roll_pickles_small():
+    """A pickled roll keeps its place in the random stream, not its buffer."""
+    import pickle
+    roll = p.FixedRoll(rng=1)
+    for i in range(10): roll.roll()
+    copy = pickle.loads(pickle.dumps(roll))
+    assert len(pickle.dumps(roll)) < 2_000
+    assert [copy.roll() for i in range(50)] == [roll.roll() for i in range(50)]
+
+
+def test_text_sink():
+    """The text sink traces the game like the transcripts in interview/runs."""
+    with tf.LogCapture() as log:
+        small_game([p.TextSink(p.logging.getLogger('craps'))])
+    lines = [r.getMessage() for r in log.records if r.levelname == 'INFO']
+    assert lines[0] == "Let's play..."
+    assert lines[1] == '** current shooter: shooter0'
+    assert lines[2].startswith('current shooter shooter0 shoots: ')
+    assert lines[-1] == 'game over'
+
+
+def test_sampled_sink():
+    """A sampled sink only sees every k-th round, plus the start and end."""
+    events = []
+    small_game([p.SampledSink(events.append, every=3)])
+    assert all(e.round % 3 == 0 for e in events if not isinstance(e, (p.StartEvent, p.OverEvent)))
+
+
+def test_disabled_sink_dropped():
+    """A sink disabled when the game starts is never called."""
+    quiet = p.logging.getLogger('craps.quiet')
+    quiet.setLevel(p.logging.WARNING)
+
+    class Disabled(p.TextSink):
+        def __call__(self, event):
+            raise AssertionError(f'called with {event}')
+
+    small_game([Disabled(quiet), p.SampledSink(Disabled(quiet), every=3)])
+
+
+def test_record_and_replay(tmp_path):
+    """A recorded game replays roll for roll from the memory mapped file."""
+    path = str(tmp_path / 'game.pycraps')
+    events = []
+    small_game([events.append, p.Recorder(path, buffer=16)])
+    rolls = [e for e in events if isinstance(e, p.RollEvent)]
+
+    replay = p.MappedSequenceGame(path, chunk=5)
+    assert len(replay) == len(rolls)
+    assert list(replay.rolls()) == [e.faces for e in rolls]
+    assert [replay.roll() for e in rolls] == [e.faces for e in rolls] and replay.roll() is None
+    assert replay.records['seat'].tolist() == [e.seat for e in rolls]
+    assert replay.records['point'].tolist() == [e.point or 0 for e in rolls]
+    rounds = list(replay.seq)
+    assert len(rounds) == sum(isinstance(e, p.DecisionEvent) for e in events)
+    assert sum(len(r['rolls']) for r in rounds) == len(rolls)
+
+
+def test_replay_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.pycraps'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        p.MappedSequenceGame(str(path))
+
+
+IMPORT_BUDGET_US = 100_000  ## interview.pycraps' own import time, without numpy, compiling the source included
+
+
+def test_import_is_quiet():
+    """Importing the library configures no logging, logs nothing, skips fire and stays within its time budget."""
+    check = ("import logging, sys; import interview.pycraps as p; "
+             "assert not logging.getLogger().handlers; assert 'fire' not in sys.modules; assert p._rng is None")
+    done = subprocess.run([sys.executable, '-X', 'importtime', '-c', check], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert done.returncode == 0, done.stderr
+    lines = done.stderr.splitlines()
+    assert all(line.startswith('import time:') for line in lines), 'nothing but -X importtime on stderr'
+    own = [int(line.split('|')[0].split(':')[1]) for line in lines if line.endswith('| interview.pycraps')]
+    assert own and own[0] < IMPORT_BUDGET_US, f'import took {own}us'
+
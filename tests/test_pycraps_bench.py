@@ -0,0 +1,40 @@
+import interview.pycraps_bench as bench
+
+"""
+pytest --verbose tests/test_pycraps_bench.py  ## run this test
+"""
+
+
+def test_bench_smoke():
+    """Every benchmark runs and reports positive numbers. Tiny sizes, the numbers themselves mean nothing here."""
+    metrics = dict()
+    metrics.update(bench.bench_dice(n=1_000, repeat=1))
+    metrics.update(bench.bench_win(n=1_000, repeat=1))
+    metrics.update(bench.bench_game(games=2, repeat=1))
+    metrics.update(bench.bench_settle(bettors=10, rounds=5, repeat=1))
+    metrics.update(bench.bench_lanes(games=20, repeat=1))
+    metrics.update(bench.bench_memory(rolls=1_000))
+    assert 'game_debug_rounds_per_sec' in metrics
+    assert all(value > 0 for value in metrics.values())
+
+
+def test_compare():
+    """Rates regress when they drop, memory regresses when it grows, within the tolerance is fine."""
+    baseline = dict(metrics=dict(roll_per_sec=100.0, win_per_sec=100.0, peak_bytes_per_million_rolls=1000.0))
+    current = dict(metrics=dict(roll_per_sec=80.0, win_per_sec=95.0, peak_bytes_per_million_rolls=1200.0))
+    report = bench.compare(current, baseline, tolerance=0.1)
+    assert sorted(report['regressions']) == ['peak_bytes_per_million_rolls', 'roll_per_sec']
+    assert report['metrics']['win_per_sec']['change'] == -0.05
+
+
+def test_sinks_overhead_budget():
+    """A disabled sink costs game() a few percent at most, best of several runs so a busy machine doesn't fail it."""
+    result = bench.bench_sinks(games=40, repeat=7)
+    assert result['overhead'] < 0.15
+
+
+def test_compare_sinks_overhead():
+    """The overhead is compared by its difference, growing by more than the tolerance is a regression."""
+    report = bench.compare(dict(metrics=dict(sinks_overhead=0.25)), dict(metrics=dict(sinks_overhead=0.02)))
+    assert report['regressions'] == ['sinks_overhead']
+    assert not bench.compare(dict(metrics=dict(sinks_overhead=0.05)), dict(metrics=dict(sinks_overhead=0.02)))['regressions']
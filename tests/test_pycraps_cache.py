@@ -0,0 +1,60 @@
+import os
+import time
+
+import interview.pycraps as p
+import interview.pycraps_cache as c
+import interview.pycraps_sim as sim
+import interview.pycraps_sweep as sw
+
+"""
+pytest --verbose tests/test_pycraps_cache.py  ## run this test
+"""
+
+small = p.Table(house=500, shooters=(300, 300), starting_bet=100)
+
+
+def test_key():
+    """The key depends on the table, the rules, the seed and the games, and is the same in every process."""
+    k = c.key('simulate', small, 1, 10)
+    assert k == c.key('simulate', p.Table(house=500, shooters=(300, 300), starting_bet=100), 1, 10)
+    assert len({k, c.key('simulate', small, 2, 10), c.key('simulate', small, 1, 11),
+                c.key('simulate', p.Table(house=600, shooters=(300, 300)), 1, 10),
+                c.key('simulate', p.Table(house=500, shooters=(300, 300), rules=p.RuleSet.of(odds=1, **{'pass': 1})), 1, 10),
+                c.key('sweep', small, 1, 10)}) == 6
+
+
+def test_get_put_refresh(tmp_path):
+    cache = c.ResultCache(str(tmp_path))
+    assert cache.get('nothing') is None
+    assert cache.fetch('k', lambda: 1) == 1
+    assert cache.fetch('k', lambda: 2) == 1
+    assert cache.fetch('k', lambda: 3, refresh=True) == 3
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_lru_eviction(tmp_path):
+    """Beyond max_bytes, the least recently used entries go, a hit counts as a use."""
+    cache = c.ResultCache(str(tmp_path), max_bytes=2_500)
+    for name in 'abc':
+        cache.put(name, b'x' * 1_000)
+        os.utime(cache._path(name), ns=(time.time_ns(), time.time_ns() + ord(name)))  ## no ties on coarse clocks
+    assert cache.get('a') is None and cache.get('b') is not None
+    os.utime(cache._path('b'), ns=(time.time_ns(), time.time_ns() + 1_000_000_000))  ## b was used last
+    cache.put('d', b'x' * 1_000)
+    assert cache.get('c') is None and cache.get('b') is not None and cache.get('d') is not None
+
+
+def test_simulate_and_sweep_cached(tmp_path):
+    """A repeated seeded run comes from the cache, the same as playing it."""
+    cache = c.ResultCache(str(tmp_path))
+    first = sim.simulate(games=16, table=small, seed=3, workers=1, chunk_size=8, cache=cache)
+    assert sim.simulate(games=16, table=small, seed=3, workers=1, chunk_size=8, cache=cache) == first
+    assert cache.hits == 1
+    rows = sw.sweep(games=10, house=[500, 600], balance=300, players=2, seed=3, workers=1, cache=cache)
+    assert sw.sweep(games=10, house=[500, 600], balance=300, players=2, seed=3, workers=1, cache=cache) == rows
+    assert cache.hits == 3
+    assert sw.sweep(games=10, house=[500, 600], balance=300, players=2, seed=3, workers=1, cache=cache,
+                    refresh=True) == rows
+    assert cache.hits == 3
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+"""
+pytest --verbose tests/test_pycraps_cli.py  ## run this test
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(*args):
+    done = subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=ROOT)
+    assert done.returncode == 0, done.stderr
+    return done.stdout.splitlines()
+
+
+def test_craps_is_the_default():
+    """A bare `python -m interview.pycraps` plays a game and ends with a line saying how it ended."""
+    assert ' rounds and ' in run('-m', 'interview.pycraps', '--level=WARNING')[-1]
+
+
+def test_simulate_with_spawned_workers(tmp_path):
+    """`python -m interview.pycraps simulate` with the spawn start method of macOS and Windows."""
+    out = str(tmp_path / 'games.csv')
+    check = ("import multiprocessing, runpy, sys; multiprocessing.set_start_method('spawn'); "
+             "sys.argv = ['pycraps', 'simulate', '--games=6', '--workers=2', '--chunk_size=3', '--seed=1', "
+             f"'--out={out}']; "
+             "runpy.run_module('interview.pycraps', run_name='__main__', alter_sys=True)")
+    assert run('-c', check)[-1].startswith(f'wrote 6 games to {out}')
+    with open(out) as f: assert len(f.read().splitlines()) == 1 + 6
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+import interview.pycraps as p
+import interview.pycraps_floor as f
+
+"""
+pytest --verbose tests/test_pycraps_floor.py  ## run this test
+"""
+
+
+def players(table, n=2, balance=1_000):
+    return [p.Shooter(name=f'{table}.{i}', balance=balance) for i in range(n)]
+
+
+def test_floor_conserves_money():
+    """Money only moves between the players and the one shared house."""
+    floor = f.Floor(p.Bettor(name='house', balance=100_000))
+    for t in range(50): floor.add_table(players(t), rng=t)
+    asyncio.run(floor.run(rounds=20))
+    everyone = [s for t in floor.tables for s in t.players]
+    assert floor.house.current_balance + sum(s.current_balance for s in everyone) == 100_000 + 50 * 2 * 1_000
+    counters = floor.counters()
+    assert counters['rounds'] == sum(t['rounds'] for t in counters['tables'].values())
+    assert all(0 < t['rounds'] <= 20 for t in counters['tables'].values())
+    assert counters['rounds_per_sec'] > 0
+
+
+def test_floor_move():
+    """A player who moves shoots at the new table."""
+    floor = f.Floor(p.Bettor(name='house', balance=100_000))
+    first, second = floor.add_table(players('a'), rng=1), floor.add_table(players('b'), rng=2)
+    mover = first.players[0]
+
+    async def play():
+        running = asyncio.ensure_future(floor.run(rounds=30))
+        await asyncio.sleep(0)
+        floor.move(mover, second)
+        await running
+
+    asyncio.run(play())
+    assert floor.table_of(mover) is second
+    assert len(first.players) == 1 and len(second.players) == 3
+    with pytest.raises(ValueError):
+        floor.move(mover, first)  ## closed after its rounds
+
+
+def test_floor_stalled_table():
+    """A table where nobody can cover the starting bet closes stalled instead of playing forever."""
+    floor = f.Floor(p.Bettor(name='house', balance=100_000))
+    table = floor.add_table([p.Shooter(name='short', balance=150)], rng=1, starting_bet=100)
+    asyncio.run(floor.run())
+    shooter, = table.players
+    assert table.closed
+    assert 0 < shooter.current_balance < 100 and table.stalled
+    assert floor.counters()['tables'][table.name]['stalled']
+
+
+def test_play_round_without_statistics():
+    decision, dice_pass, payout = p.play_round(p.FixedRoll(rng=1), p.Bettor(name='house', balance=1_000),
+                                               p.Shooter(name='s', balance=1_000), [p.Shooter(name='s', balance=1_000)])
+    assert isinstance(dice_pass, p.DicePass)
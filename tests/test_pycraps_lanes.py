@@ -0,0 +1,46 @@
+import pytest
+import interview.pycraps as p
+import interview.pycraps_lanes as lanes
+import interview.pycraps_markov as m
+
+"""
+pytest --verbose tests/test_pycraps_lanes.py  ## run this test
+"""
+
+small = p.Table(house=500, shooters=(300, 300), starting_bet=100)  ## short games keep the tests fast
+
+
+def test_lanes_conserve_money():
+    """Money only moves between the house and the shooters, every game ends."""
+    played = lanes.Lanes(1_000, small, rng=3).run()
+    assert played.done.all()
+    assert ((played.house + played.balances.sum(axis=1)) == small.house + sum(small.shooters)).all()
+    assert (played.rolls >= played.rounds).all()
+    statistics = played.statistics()
+    assert statistics['house_busted'] + statistics['shooters_busted'] == 1_000
+
+
+def test_lanes_step():
+    """A step rolls every live lane once, finished lanes stay put."""
+    played = lanes.Lanes(10, small, rng=0)
+    assert played.step() == 10
+    assert (played.rolls == 1).all()
+    played.done[:5] = True
+    assert played.step() == 5
+    assert list(played.rolls) == [1] * 5 + [2] * 5
+
+
+def test_lanes_match_exact_odds():
+    """The lanes play game(): the house's ruin and the game's length match the exact Markov chain."""
+    result = lanes.simulate(games=20_000, table=small, seed=1, lanes=7_000)
+    exact = m.solve(small)
+    assert result['games'] == 20_000
+    assert result['house_bust_rate'] == pytest.approx(exact['p_house_ruin'], abs=0.015)
+    assert result['rounds'] / result['games'] == pytest.approx(exact['expected_rounds'], rel=0.03)
+    assert result['rolls'] / result['rounds'] == pytest.approx(exact['expected_rolls_per_round'], rel=0.02)
+
+
+def test_lanes_stall():
+    """Nobody left can cover the bet: the lanes end the game and count it as stalled, like game()."""
+    result = lanes.simulate(games=100, table=p.Table(house=1_000, shooters=(150,)), seed=2)
+    assert result['stalled'] + result['house_busted'] == 100
@@ -0,0 +1,42 @@
+import pytest
+import interview.pycraps as p
+import interview.pycraps_markov as m
+
+"""
+pytest --verbose tests/test_pycraps_markov.py  ## run this test
+"""
+
+
+def test_total_distribution():
+    distribution = m.total_distribution()
+    assert sorted(distribution) == list(range(2, 13))
+    assert distribution[7] == pytest.approx(6 / 36)
+    assert sum(distribution.values()) == pytest.approx(1)
+
+
+def test_round_odds():
+    """The pass line wins 244 of 495 rounds, a round takes 557/165 rolls on average."""
+    odds = m.round_odds()
+    assert odds['outcomes'][(p.Round.WIN, p.DicePass.STAY, p.BetPayout.WIN)] == pytest.approx(244 / 495)
+    assert odds['outcomes'][(p.Round.LOSE, p.DicePass.NEXT, p.BetPayout.LOSE)] == pytest.approx(251 / 495)
+    assert odds['expected_rolls'] == pytest.approx(557 / 165)
+
+
+def test_solve_house_recovers():
+    """
+    Like game(), the house can dip below zero while the shooter wins and recovers when the dice pass. With $100 each,
+    the shooter's turn ends in shooter ruin after no wins, back at the start after one win and house ruin after two.
+    """
+    solved = m.solve(p.Table(house=100, shooters=(100,), starting_bet=100))
+    win, lose = 244 / 495, 251 / 495
+    assert solved['p_house_ruin'] == pytest.approx(win ** 2 / (win ** 2 + lose))
+    assert solved['p_house_ruin'] + solved['p_shooters_ruin'] + solved['p_stalled'] == pytest.approx(1)
+    assert solved['expected_payout'] == pytest.approx(-7 / 495)
+
+
+def test_solve_stalled():
+    """Shooters left with less than the starting bet can't bet, the game stalls."""
+    solved = m.solve(p.Table(house=1_000, shooters=(150,), starting_bet=100))
+    assert solved['p_shooters_ruin'] == 0  ## the shooter never gets below $50
+    assert solved['p_stalled'] > 251 / 495  ## losing the first round already stalls
+    assert solved['p_stalled'] + solved['p_house_ruin'] == pytest.approx(1)
@@ -0,0 +1,78 @@
+import pytest
+import interview.pycraps as p
+import interview.pycraps_replay as r
+
+"""
+pytest --verbose tests/test_pycraps_replay.py  ## run this test
+"""
+
+table = p.Table(house=2_000, shooters=(500, 500), starting_bet=100)
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    """A recorded game and its rounds as game_rounds() yielded them while it was played."""
+    path = str(tmp_path / 'game.pycraps')
+    rounds = list(table.rounds(rng=3, sinks=[p.Recorder(path)]))
+    return p.MappedSequenceGame(path), rounds
+
+
+def test_sequence_roll_plays_a_game():
+    """A SequenceRoll feeds game() tuples: a point of 5 made, an 11, then a seven out busts the house."""
+    statistics = p.game(roll=p.SequenceRoll([(4, 1), (1, 4), (6, 5), (3, 3), (5, 2)]), house=p.Bettor('house', 100),
+                        shooters=[p.Shooter('Mike', 300)])
+    assert statistics['rounds'] == 3 and statistics['rolls'] == 5
+    assert statistics['house_busted'] == 1
+
+
+def test_sequence_game_plays_a_game(recorded):
+    """A SequenceGame and a MappedSequenceGame are rolls too, one throw per roll() like a SequenceRoll."""
+    mike = p.Shooter('Mike', 300)
+    recorded_game = p.SequenceGame([mike], [dict(shooter=mike, rolls=[(4, 1), (1, 4)]),
+                                            dict(shooter=mike, rolls=[(6, 5)]),
+                                            dict(shooter=mike, rolls=[(3, 3), (5, 2)])])
+    statistics = p.game(roll=recorded_game, house=p.Bettor('house', 100), shooters=[mike])
+    assert statistics['rounds'] == 3 and statistics['rolls'] == 5
+    recording, rounds = recorded
+    roll, house, shooters = table.setup()
+    replayed = p.game(roll=recording, house=house, shooters=shooters, starting_bet=table.starting_bet)
+    assert replayed['rounds'] == len(rounds)
+
+
+def test_replay_plays_the_recording(recorded):
+    recording, rounds = recorded
+    replay = r.Replay(recording, table)
+    assert len(replay) == len(rounds)
+    assert list(replay.play()) == rounds
+
+
+def test_seek(recorded):
+    """Every round comes back the same from the index, however far from a snapshot."""
+    recording, rounds = recorded
+    replay = r.Replay(recording, table, every=4).index()
+    assert [replay.round(k) for k in range(len(rounds))] == rounds
+    assert list(replay.seek(len(rounds) - 3)) == rounds[-3:]
+    with pytest.raises(ValueError):
+        replay.seek(len(rounds))
+
+
+def test_sequence_game_replays(recorded):
+    """A SequenceGame of the same rounds replays the same way."""
+    recording, rounds = recorded
+    game = p.SequenceGame(None, list(recording.seq))
+    assert r.Replay(game, table, every=3).round(len(rounds) - 1) == rounds[-1]
+
+
+def test_index_save_load(recorded, tmp_path):
+    recording, rounds = recorded
+    path = str(tmp_path / 'index.npz')
+    r.Replay(recording, table, every=5).save_index(path)
+    replay = r.Replay(recording, table).load_index(path)
+    assert replay.every == 5
+    assert replay.round(len(rounds) // 2) == rounds[len(rounds) // 2]
+
+
+def test_index_checks_the_table(recorded):
+    recording, rounds = recorded
+    with pytest.raises(ValueError):
+        r.Replay(recording, p.Table(house=2_000, shooters=(500,), starting_bet=100)).index()
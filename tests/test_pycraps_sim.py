@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+import interview.pycraps as p
+import interview.pycraps_sim as sim
+
+"""
+pytest --verbose tests/test_pycraps_sim.py  ## run this test
+"""
+
+small = p.Table(house=500, shooters=(300, 300), starting_bet=100)  ## short games keep the tests fast
+
+
+def test_simulate_counts():
+    result = sim.simulate(games=50, table=small, seed=7, workers=2, chunk_size=8)
+    assert result['games'] == 50
+    assert result['house_busted'] + result['shooters_busted'] == 50
+    assert result['rolls'] >= result['rounds'] > 0
+    assert 0 <= result['house_bust_rate'] <= 1
+
+
+def test_simulate_same_seed_any_workers():
+    """A seed fixes the result, however many workers play the games."""
+    one = sim.simulate(games=40, table=small, seed=11, workers=1, chunk_size=8)
+    three = sim.simulate(games=40, table=small, seed=11, workers=3, chunk_size=8)
+    assert one == three
+
+
+def test_simulate_chunks_merge():
+    """The counts don't depend on how the games are chunked, the running means only up to rounding."""
+    one = sim.simulate(games=40, table=small, seed=11, workers=1, chunk_size=40)
+    many = sim.simulate(games=40, table=small, seed=11, workers=2, chunk_size=7)
+    for count in p.Statistics.COUNTS: assert one[count] == many[count]
+    assert one['totals'] == many['totals']
+    assert abs(one['outcomes'].mean - many['outcomes'].mean) < 1e-9
+
+
+def test_simulate_until_converges():
+    """Stops once the interval is narrow enough, not long after."""
+    result = sim.simulate_until('mean_rounds', half_width=1.0, table=small, seed=3, workers=1, batch=100, min_games=200)
+    assert result['converged']
+    assert result['half_width'] <= 1.0
+    assert result['low'] < result['estimate'] < result['high']
+    assert 200 <= result['games'] < 2_000
+    assert result['rolls'] > result['games']
+
+
+def test_simulate_until_rate_without_events():
+    """No house bust yet doesn't make the bust rate exact, it takes the games the Wilson interval needs."""
+    rich = p.Table(house=10 ** 9, shooters=(300,))
+    result = sim.simulate_until('house_bust_rate', half_width=0.01, table=rich, seed=3, workers=1, batch=100,
+                                min_games=100)
+    assert result['converged'] and result['estimate'] == 0.0
+    assert result['low'] == pytest.approx(0.0, abs=1e-12)
+    assert 0 < result['half_width'] <= 0.01
+    assert result['games'] > 150
+
+
+def test_simulate_until_max_games():
+    result = sim.simulate_until('house_edge', half_width=1e-6, table=small, seed=3, workers=1, batch=100,
+                                min_games=100, max_games=300)
+    assert not result['converged']
+    assert result['games'] == 300
+
+
+def test_simulate_until_rejects_unknown_metric():
+    with pytest.raises(ValueError):
+        sim.simulate_until('luck')
+
+
+def test_write_games_csv_and_npz(tmp_path):
+    """One row per game in order, the same rows in either format, money only moves around."""
+    csv, npz = str(tmp_path / 'games.csv'), str(tmp_path / 'games.npz')
+    sim.write_games(csv, 30, small, seed=5, workers=1, chunk_size=8)
+    sim.write_games(npz, 30, small, seed=5, workers=1, chunk_size=8)
+    rows = np.loadtxt(csv, delimiter=',', skiprows=1, dtype=np.int64)
+    columns = np.load(npz)
+    assert open(csv).readline().strip().split(',') == list(sim.game_columns(small))
+    assert list(rows[:, 0]) == list(range(30))
+    for i, column in enumerate(sim.game_columns(small)): assert list(columns[column]) == list(rows[:, i])
+    assert (columns['house'] + columns['shooter0'] + columns['shooter1'] == 500 + 600).all()
+    assert (columns['house_busted'] == (columns['house'] <= 0)).all()
+
+
+def test_simulate_command(tmp_path):
+    out = str(tmp_path / 'games.csv')
+    line = p.simulate(games=10, house=500, shooters=[300, 300], seed=1, workers=1, out=out)
+    assert line.startswith(f'wrote 10 games to {out}')
+    with pytest.raises(ValueError):
+        p.simulate(games=10, out=str(tmp_path / 'games.txt'))
@@ -0,0 +1,47 @@
+import csv
+
+import pytest
+import interview.pycraps as p
+import interview.pycraps_sweep as sw
+
+"""
+pytest --verbose tests/test_pycraps_sweep.py  ## run this test
+"""
+
+
+def test_grid_dedupes():
+    tables = sw.grid(starting_bet=[100, 100], house=[500, 1_000], balance=300, players=[1, 2])
+    assert len(tables) == 4
+    assert tables[0] == p.Table(house=500, shooters=(300,), starting_bet=100)
+    assert sw.parameters_of(tables[-1]) == dict(starting_bet=100, house=1_000, balance=300, players=2)
+
+
+def test_sweep_rows(tmp_path):
+    """A row per table in grid order, streamed to the CSV file, the same for any number of workers."""
+    out = str(tmp_path / 'sweep.csv')
+    rows = sw.sweep(games=20, house=[500, 1_000], balance=300, players=2, seed=3, workers=2, chunk_size=8, out=out)
+    assert [row['house'] for row in rows] == [500, 1_000]
+    assert all(row['games'] == 20 and row['seed'] == 3 for row in rows)
+    with open(out) as f: written = list(csv.DictReader(f))
+    assert sorted(int(row['house']) for row in written) == [500, 1_000]
+    assert rows == sw.sweep(games=20, house=[500, 1_000], balance=300, players=2, seed=3, workers=1, chunk_size=20)
+
+
+def test_sweep_matches_simulate():
+    """The same seed plays the same games as pycraps_sim."""
+    import interview.pycraps_sim as sim
+    row, = sw.sweep(games=16, house=500, balance=300, players=2, seed=5, workers=1, chunk_size=8)
+    result = sim.simulate(games=16, table=sw.table_of(100, 500, 300, 2), seed=5, workers=1, chunk_size=8)
+    assert row['house_bust_rate'] == result['house_bust_rate']
+    assert row['mean_rounds'] == result['rounds'] / 16
+
+
+def test_refine_adds_points():
+    """Refining adds tables between the steepest neighbours and plays more games at the ends."""
+    rows = sw.refine('house', house=[200, 2_000, 20_000], balance=300, players=2, games=10, steps=1, split=1, seed=1,
+                     workers=1, chunk_size=10)
+    assert len(rows) == 4
+    assert [row['house'] for row in rows] == sorted(row['house'] for row in rows)
+    assert sorted(row['games'] for row in rows) == [10, 10, 20, 20]
+    with pytest.raises(ValueError):
+        sw.refine('nonsense')
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import interview.pycraps as p
+import interview.pycraps_variance as v
+
+"""
+pytest --verbose tests/test_pycraps_variance.py  ## run this test
+"""
+
+
+def hand_at_least(rolls):
+    """The exact probability that a shooter keeps the dice for at least `rolls` rolls."""
+    distribution = {total: ways / 36 for total, ways in zip(range(2, 13), (1, 2, 3, 4, 5, 6, 5, 4, 3, 2, 1))}
+    alive = {None: 1.0}
+    for n in range(rolls - 1):
+        following = dict()
+        for point, q in alive.items():
+            for total, r in distribution.items():
+                decision, dice_pass, point_, payout = p.win(total, point)
+                if dice_pass == p.DicePass.STAY: following[point_] = following.get(point_, 0.0) + q * r
+        alive = following
+    return sum(alive.values())
+
+
+def test_tilted_dice():
+    dice = v.TiltedDice(p=v.exponential_tilt(range(1, 7), 1.0), rng=0)
+    assert dice.p[5] > dice.p[0]
+    assert np.mean(dice.roll_batch(10_000)) > 4.5
+    with pytest.raises(ValueError):
+        v.TiltedDice(p=[0.5, 0.5])
+
+
+def test_weights_average_one():
+    """The likelihood ratio of a tilted throw averages 1, a fair roll always weighs 1."""
+    tilted = v.WeightedRoll(p=v.total_tilt({7: 0.5}), rng=1)
+    weights = []
+    for i in range(20_000):
+        tilted.restart().roll()
+        weights.append(tilted.weight)
+    assert np.mean(weights) == pytest.approx(1, abs=0.02)
+    fair = v.WeightedRoll(rng=1)
+    fair.roll()
+    assert fair.weight == 1
+
+
+def test_mirrored_throws():
+    """A mirrored roll turns every 7 into one of the least likely totals."""
+    plain, mirrored = v.WeightedRoll(rng=3), v.WeightedRoll(mirrored=True, rng=3)
+    for i in range(1_000):
+        a, b = sum(plain.roll()), sum(mirrored.roll())
+        if a == 7: assert b in (2, 3, 11, 12)
+
+
+def test_importance_long_hand():
+    """Fewer 7s make long hands common, the weights keep the estimate right with a fraction of the variance."""
+    exact = hand_at_least(30)
+    plain = v.importance(v.long_hand(30), samples=20_000, seed=2)
+    tilted = v.importance(v.long_hand(30), samples=20_000, p=v.total_tilt({7: 0.5}), seed=2)
+    assert tilted['estimate'] == pytest.approx(exact, abs=4 * tilted['std_error'])
+    assert tilted['variance'] < plain['variance'] / 2
+    assert plain['ess'] == 20_000 and tilted['ess'] < 20_000
+
+
+def test_antithetic():
+    report = v.antithetic(v.long_hand(3), samples=2_000, seed=1)
+    assert report['estimate'] == pytest.approx(hand_at_least(3), abs=4 * report['std_error'])
+    assert report['ess'] > 2 * 2_000  ## better than playing the mirrored games independently
+
+
+def test_common_random_numbers():
+    """Comparing two tables on the same dice beats comparing independent estimates."""
+    small = p.Table(house=500, shooters=(300, 300))
+    bigger = p.Table(house=700, shooters=(300, 300))
+    report = v.common(v.house_ruin(small), v.house_ruin(bigger), samples=500, seed=1)
+    assert report['estimate'] > 0
+    assert report['ess'] > 2 * 500